@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""
+Performance benchmarks of the dsfaker generators.
+
+Run with `python -m benchmarks run -o results.json`, and compare two runs with
+`python -m benchmarks compare baseline.json results.json`.
+"""
+from .cases import *
+from .runner import *
@@ -0,0 +1,71 @@
+import argparse
+import json
+import sys
+
+from .runner import BATCH_SIZES, run, compare
+
+
+def _print_results(results):
+    print('{:<28} {:<10} {:>10} {:>16} {:>14}'.format('name', 'method', 'batch', 'rows/s', 'ns/row'))
+    for r in results['results']:
+        print('{:<28} {:<10} {:>10} {:>16,.0f} {:>14.2f}'.format(r['name'], r['method'], r['batch_size'],
+                                                                r['rows_per_sec'], r['ns_per_row']))
+
+
+def _print_comparison(rows):
+    print('{:<28} {:<10} {:>10} {:>14} {:>14} {:>8}'.format('name', 'method', 'batch', 'baseline ns', 'ns/row',
+                                                          'ratio'))
+    for r in rows:
+        print('{:<28} {:<10} {:>10} {:>14.2f} {:>14.2f} {:>7.2f}x{}'.format(
+            r['name'], r['method'], r['batch_size'], r['baseline_ns_per_row'], r['ns_per_row'], r['ratio'],
+            '  REGRESSION' if r['regression'] else ''))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Benchmarks of the dsfaker generators')
+    subparsers = parser.add_subparsers(dest='command')
+
+    run_parser = subparsers.add_parser('run', help='run the benchmarks')
+    run_parser.add_argument('-o', '--output', help='JSON file to write the results to')
+    run_parser.add_argument('-k', '--filter', help='only run the cases whose name matches this regex')
+    run_parser.add_argument('--sizes', default=','.join(str(s) for s in BATCH_SIZES),
+                            help='comma separated batch sizes (default: %(default)s)')
+    run_parser.add_argument('--min-time', type=float, default=0.2, help='seconds spent on each measure')
+    run_parser.add_argument('--baseline', help='JSON file of a previous run to compare the results with')
+    run_parser.add_argument('--threshold', type=float, default=0.1,
+                            help='relative slowdown reported as a regression (default: %(default)s)')
+
+    compare_parser = subparsers.add_parser('compare', help='compare two runs')
+    compare_parser.add_argument('baseline', help='JSON file of the reference run')
+    compare_parser.add_argument('current', help='JSON file of the run to check')
+    compare_parser.add_argument('--threshold', type=float, default=0.1,
+                                help='relative slowdown reported as a regression (default: %(default)s)')
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        results = run(pattern=args.filter, batch_sizes=[int(s) for s in args.sizes.split(',')],
+                      min_time=args.min_time)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=2)
+        if args.baseline is None:
+            _print_results(results)
+            return 0
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    elif args.command == 'compare':
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            results = json.load(f)
+    else:
+        parser.print_help()
+        return 2
+
+    rows = compare(baseline, results, threshold=args.threshold)
+    _print_comparison(rows)
+    return 1 if any(r['regression'] for r in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+import operator
+
+import numpy
+
+from dsfaker.generators import Generator, Autoincrement, AutoincrementWithGenerator, RepeatPattern, RandomDatetime, \
+    ConstantValueGenerator, BoundingOperator, ScalingOperator, ApplyFunctionOperator, AbsoluteOperator, CastOperator, \
+    TimeDelayedGenerator, History, MeanHistory, ReduceOperator, AddOperator, SubOperator, TrueDivOperator, \
+    FloorDivOperator, MulOperator, PowOperator, ModOperator, AndOperator, OrOperator, XorOperator, Sin, Cos, Tan, \
+    Sinh, Cosh, Tanh, TimeSeries, Beta, Binomial, BinomialNegative, CauchyStandard, Chisquare, ChisquareNonCentral, \
+    Dirichlet, Exponential, F, FNonCentral, Gamma, Geometric, Gumbel, Hypergeometric, Laplace, Logistic, Lognormal, \
+    Lomax, Multinomial, Normal, NormalMultivariate, Poisson, Power, Randint, RandomSample, Rayleigh, Triangular, \
+    Uniform, Vonmises, Wald, Weibull, Zipf, Choice
+from dsfaker.generators.str import Regex
+
+__all__ = ['CASES']
+
+
+def _int(value=7):
+    return ConstantValueGenerator(value, dtype=numpy.int64)
+
+
+class _Single(Generator):
+    """
+    A Generator with only get_single, measuring the default get_batch.
+    """
+    def get_single(self):
+        return 1.5
+
+
+class _SingleDtype(_Single):
+    dtype = numpy.float64
+
+
+# Every case is a name and a function building a fresh Generator, so that each measure starts from the same state
+CASES = [
+    # distributions.py
+    ('Beta', lambda: Beta(a=2, b=2, seed=0)),
+    ('Binomial', lambda: Binomial(n=20, p=0.5, seed=0)),
+    ('BinomialNegative', lambda: BinomialNegative(n=20, p=0.5, seed=0)),
+    ('CauchyStandard', lambda: CauchyStandard(seed=0)),
+    ('Chisquare', lambda: Chisquare(k=6, seed=0)),
+    ('ChisquareNonCentral', lambda: ChisquareNonCentral(k=4, nonc=1, seed=0)),
+    ('Dirichlet', lambda: Dirichlet(alpha=[0.3, 0.3, 0.3], seed=0)),
+    ('Exponential', lambda: Exponential(seed=0)),
+    ('F', lambda: F(dfnum=5, dfden=2, seed=0)),
+    ('FNonCentral', lambda: FNonCentral(dfnum=10, dfden=20, nonc=5, seed=0)),
+    ('Gamma', lambda: Gamma(k=1.0, seed=0)),
+    ('Geometric', lambda: Geometric(p=0.5, seed=0)),
+    ('Gumbel', lambda: Gumbel(seed=0)),
+    ('Hypergeometric', lambda: Hypergeometric(n=50, m=50, N=80, seed=0)),
+    ('Laplace', lambda: Laplace(mu=-5, beta=4, seed=0)),
+    ('Logistic', lambda: Logistic(mu=6, beta=2, seed=0)),
+    ('Lognormal', lambda: Lognormal(mu=0, sigma=1.5, seed=0)),
+    ('Lomax', lambda: Lomax(a=2, seed=0)),
+    ('Multinomial', lambda: Multinomial(n=10, pvals=[1 / 10 for _ in range(10)], seed=0)),
+    ('Normal', lambda: Normal(seed=0)),
+    ('Normal[legacy]', lambda: Normal(seed=0, legacy=True)),
+    ('NormalMultivariate', lambda: NormalMultivariate(mu=[0, 0], cov=[[1, 0], [0, 100]], seed=0)),
+    ('Poisson', lambda: Poisson(lam=4, seed=0)),
+    ('Power', lambda: Power(a=2, seed=0)),
+    ('Randint', lambda: Randint(lb=-10, ub=20, seed=0)),
+    ('RandomSample', lambda: RandomSample(seed=0)),
+    ('Rayleigh', lambda: Rayleigh(sigma=1, seed=0)),
+    ('Triangular', lambda: Triangular(left=10, mode=22, right=42, seed=0)),
+    ('Uniform', lambda: Uniform(lb=-42, ub=84, seed=0)),
+    ('Vonmises', lambda: Vonmises(mu=-1, kappa=1, seed=0)),
+    ('Wald', lambda: Wald(mu=2, lam=0.2, seed=0)),
+    ('Weibull', lambda: Weibull(a=0.5, seed=0)),
+    ('Zipf', lambda: Zipf(a=2, seed=0)),
+    ('Choice', lambda: Choice(probabilities=[.05, .15, .05, .20, .25, .10, .20], seed=0)),
+
+    # base.py
+    ('Generator[get_single]', lambda: _Single()),
+    ('Generator[get_single,dtype]', lambda: _SingleDtype()),
+    ('AddOperator', lambda: AddOperator(Normal(seed=0), Normal(seed=1))),
+    ('SubOperator', lambda: SubOperator(Normal(seed=0), Normal(seed=1))),
+    ('TrueDivOperator', lambda: TrueDivOperator(Normal(seed=0), Uniform(1, 2, seed=1))),
+    ('FloorDivOperator', lambda: FloorDivOperator(Normal(seed=0), Uniform(1, 2, seed=1))),
+    ('MulOperator', lambda: MulOperator(Normal(seed=0), Normal(seed=1))),
+    ('PowOperator', lambda: PowOperator(Uniform(0, 2, seed=0), 3)),
+    ('ModOperator', lambda: ModOperator(Normal(seed=0), 0.5)),
+    ('AndOperator', lambda: AndOperator(Randint(0, 1024, seed=0), _int())),
+    ('OrOperator', lambda: OrOperator(Randint(0, 1024, seed=0), _int())),
+    ('XorOperator', lambda: XorOperator(Randint(0, 1024, seed=0), _int())),
+    ('ReduceOperator', lambda: ReduceOperator(Normal(seed=0), Normal(seed=1), reduce_lambda=operator.add)),
+    ('Expression', lambda: Normal(seed=0) * 3 + (Normal(seed=1) - Autoincrement()) * 2 - Autoincrement() / 4),
+    ('CompiledOperator', lambda: (Normal(seed=0) * 3 + (Normal(seed=1) - Autoincrement()) * 2
+                                  - Autoincrement() / 4).compile()),
+
+    # utils.py
+    ('ConstantValueGenerator', lambda: _int()),
+    ('BoundingOperator', lambda: BoundingOperator(Normal(seed=0), lb=-1, ub=1)),
+    ('ScalingOperator', lambda: ScalingOperator(Uniform(0, 1, seed=0), lb=-10, ub=10)),
+    ('ApplyFunctionOperator', lambda: ApplyFunctionOperator(numpy.exp, Normal(seed=0))),
+    ('AbsoluteOperator', lambda: AbsoluteOperator(Normal(seed=0))),
+    ('CastOperator', lambda: CastOperator(Normal(seed=0), dtype=numpy.int16)),
+    ('TimeDelayedGenerator', lambda: TimeDelayedGenerator(Normal(seed=0), time_delay_sec=0)),
+    ('History', lambda: History(Normal(seed=0), 1000)),
+    ('MeanHistory', lambda: MeanHistory(Normal(seed=0), 1000)),
+
+    # autoincrement.py, date.py, series.py, str.py, timeseries.py, trigonometric.py
+    ('Autoincrement', lambda: Autoincrement()),
+    ('AutoincrementWithGenerator', lambda: AutoincrementWithGenerator(start=0, generator=Exponential(seed=0))),
+    ('RandomDatetime', lambda: RandomDatetime(Uniform(0, 1, seed=0), start=numpy.datetime64('1950-01-01'),
+                                              end=numpy.datetime64('2042-01-01'), unit='s')),
+    ('RepeatPattern', lambda: RepeatPattern(numpy.arange(24))),
+    ('Regex', lambda: Regex(r'(0|\+33|0033)[1-9][0-9]{8}', seed=0)),
+    ('TimeSeries', lambda: TimeSeries(Autoincrement(), Normal(seed=0))),
+    ('Sin', lambda: Sin(Autoincrement())),
+    ('Cos', lambda: Cos(Autoincrement())),
+    ('Tan', lambda: Tan(Autoincrement())),
+    ('Sinh', lambda: Sinh(Uniform(-5, 5, seed=0))),
+    ('Cosh', lambda: Cosh(Uniform(-5, 5, seed=0))),
+    ('Tanh', lambda: Tanh(Autoincrement())),
+]
@@ -0,0 +1,91 @@
+import datetime
+import platform
+import re
+import time
+
+import numpy
+
+from .cases import CASES
+
+__all__ = ['BATCH_SIZES', 'measure', 'run', 'compare']
+
+BATCH_SIZES = [1, 100, 10000, 1000000]
+
+
+def measure(function, rows: int, min_time: float=0.2, max_loops: int=100000) -> dict:
+    """
+    Calls function (which produces rows rows at each call) until min_time seconds have elapsed,
+    and returns the throughput of the fastest of the calls, as rows per second and nanoseconds per row.
+    """
+    best = None
+    loops = 0
+    start = time.perf_counter()
+    while loops < max_loops and (loops == 0 or time.perf_counter() - start < min_time):
+        t = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - t
+        best = elapsed if best is None else min(best, elapsed)
+        loops += 1
+    best = max(best, 1e-9)
+    return {
+        'rows_per_sec': rows / best,
+        'ns_per_row': best * 1e9 / rows,
+        'loops': loops,
+    }
+
+
+def run(pattern: str=None, batch_sizes: list=None, min_time: float=0.2, single_rows: int=1000) -> dict:
+    """
+    Measures get_single (by groups of single_rows calls) and get_batch at every batch size,
+    for every case whose name matches pattern.
+    """
+    batch_sizes = BATCH_SIZES if batch_sizes is None else batch_sizes
+    results = []
+    for name, make in CASES:
+        if pattern is not None and re.search(pattern, name) is None:
+            continue
+
+        generator = make()
+
+        def singles():
+            for _ in range(single_rows):
+                generator.get_single()
+        results.append(dict(name=name, method='get_single', batch_size=1,
+                            **measure(singles, rows=single_rows, min_time=min_time)))
+
+        for batch_size in batch_sizes:
+            generator = make()
+            results.append(dict(name=name, method='get_batch', batch_size=batch_size,
+                                **measure(lambda: generator.get_batch(batch_size), rows=batch_size, min_time=min_time)))
+
+    return {
+        'meta': {
+            'date': datetime.datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'numpy': numpy.__version__,
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+        },
+        'results': results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float=0.1) -> list:
+    """
+    Returns, for every measure present in both runs, the ratio of the current ns/row over the baseline one,
+    and whether it is a regression (slower by more than threshold).
+    """
+    def key(result):
+        return result['name'], result['method'], result['batch_size']
+
+    reference = {key(r): r for r in baseline['results']}
+    rows = []
+    for result in current['results']:
+        base = reference.get(key(result))
+        if base is None:
+            continue
+        ratio = result['ns_per_row'] / base['ns_per_row']
+        rows.append(dict(name=result['name'], method=result['method'], batch_size=result['batch_size'],
+                         baseline_ns_per_row=base['ns_per_row'], ns_per_row=result['ns_per_row'],
+                         ratio=ratio, regression=ratio > 1 + threshold))
+    return rows
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+import argparse
+import importlib
+import multiprocessing
+import os
+import pickle
+import sys
+import time
+
+import numpy
+
+from . import spec as spec_module
+from .generators.base import Generator, _payload, _rebuild, _seek_tree
+from .writers import WRITERS, write
+
+__all__ = ['load', 'generate', 'main']
+
+
+def load(spec: str) -> Generator:
+    """
+    Loads a Generator from a spec: either the path of a .json, .yaml or .yml spec file (see dsfaker.spec), the path
+    of a pickled Generator, or module:attribute where the attribute (possibly dotted) is a Generator or a callable
+    returning one, such as a class or a factory function.
+
+    :param spec: the spec of the Generator
+    """
+    if os.path.isfile(spec) and os.path.splitext(spec)[1].lower() in ('.json', '.yaml', '.yml'):
+        generator = spec_module.load(spec)
+    elif os.path.isfile(spec):
+        with open(spec, 'rb') as f:
+            generator = pickle.load(f)
+    else:
+        module, sep, attribute = spec.partition(':')
+        if not sep:
+            raise ValueError("{!r} is neither a file nor a module:attribute spec".format(spec))
+        generator = importlib.import_module(module)
+        for name in attribute.split('.'):
+            generator = getattr(generator, name)
+        if not isinstance(generator, Generator) and callable(generator):
+            generator = generator()
+    if not isinstance(generator, Generator):
+        raise ValueError("{!r} does not give a Generator".format(spec))
+    return generator
+
+
+def _shard_path(output: str, shard: int, shards: int) -> str:
+    """
+    Returns the path of a shard: output formatted with shard, or output with the shard number before its extension.
+    """
+    if '{' in output:
+        return output.format(shard=shard)
+    if shards == 1:
+        return output
+    root, ext = os.path.splitext(output)
+    return '{}-{:05d}{}'.format(root, shard, ext)
+
+
+_worker = {}
+
+
+def _init_worker(payload: tuple, rows, nbytes):
+    _worker.update(payload=payload, rows=rows, nbytes=nbytes)
+
+
+def _progress(rows: int, nbytes: int):
+    with _worker['rows'].get_lock():
+        _worker['rows'].value += rows
+    with _worker['nbytes'].get_lock():
+        _worker['nbytes'].value += nbytes
+
+
+def _write_shard(task: tuple) -> int:
+    """
+    Runs in a worker process of generate: writes the rows start to stop of a shard with its own copy of the Generator,
+    reseeded with the seed of the shard, its parts that support seek being moved to start.
+    """
+    path, start, stop, seed, batch_size, format = task
+    generator = _rebuild(_worker['payload'])
+    generator.reseed(seed)
+    _seek_tree(generator, start)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return write(generator, path, stop - start, batch_size=batch_size, format=format, progress=_progress)
+
+
+def generate(generator: Generator, output: str, nb_rows: int, shards: int=None, workers: int=None, seed=None,
+             batch_size: int=65536, format: str=None, interval: float=1.0, file=sys.stderr) -> list:
+    """
+    Writes nb_rows elements of a Generator to one file per shard, the shards being written by worker processes.
+
+    The Generator is sent to the workers as its spec when the graph can be described (see dsfaker.spec), else pickled.
+    The shard i holds the rows nb_rows * i // shards to nb_rows * (i + 1) // shards, generated by a copy of the Generator
+    reseeded with the i-th child spawned from `numpy.random.SeedSequence(seed)`, and whose parts supporting seek (such
+    as Autoincrement, wherever it is in the tree) are moved to its first row: a seed and a number of shards always give
+    the same files, whatever the number of workers.
+
+    :param generator: the Generator of the rows (a Table for several columns)
+    :param output: the path of the files, formatted with shard (such as 'data/part-{shard:05d}.npy'), or to which
+        the shard number is appended before the extension
+    :param nb_rows: the total number of rows
+    :param shards: the number of files, the number of workers by default
+    :param workers: the number of worker processes, the number of CPUs by default
+    :param seed: the seed (or numpy.random.SeedSequence) from which the shards are reseeded
+    :param batch_size: the number of rows generated and written at a time
+    :param format: the format of the files (see dsfaker.writers.write), by default the extension of output
+    :param interval: the seconds between two progress reports
+    :param file: where to report the progress, None to be silent
+    :return: the paths of the files
+    """
+    workers = workers or os.cpu_count()
+    shards = shards or workers
+    seed = seed if isinstance(seed, numpy.random.SeedSequence) else numpy.random.SeedSequence(seed)
+    paths = [_shard_path(output, i, shards) for i in range(shards)]
+    tasks = [(path, nb_rows * i // shards, nb_rows * (i + 1) // shards, shard_seed, batch_size, format)
+             for i, (path, shard_seed) in enumerate(zip(paths, seed.spawn(shards)))]
+
+    context = multiprocessing.get_context()
+    rows, nbytes = context.Value('q', 0), context.Value('q', 0)
+    start = time.perf_counter()
+
+    def report(end='\r'):
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        print('{:>15,} / {:,} rows  {:>14,.0f} rows/s  {:>10,.1f} MB/s'.format(
+            rows.value, nb_rows, rows.value / elapsed, nbytes.value / elapsed / 1e6), end=end, file=file, flush=True)
+
+    with context.Pool(min(workers, shards), initializer=_init_worker,
+                      initargs=(_payload(generator), rows, nbytes)) as pool:
+        result = pool.map_async(_write_shard, tasks, chunksize=1)
+        while not result.ready():
+            result.wait(interval)
+            if file is not None:
+                report()
+        result.get()
+    if file is not None:
+        report(end='\n')
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='dsfaker', description='Data Science Faker')
+    subparsers = parser.add_subparsers(dest='command')
+
+    generate_parser = subparsers.add_parser('generate', help='write the rows of a Generator to sharded files')
+    generate_parser.add_argument('spec', help='a .json or .yaml spec file, a pickled Generator, '
+                                              'or module:attribute giving a Generator')
+    generate_parser.add_argument('-n', '--rows', type=int, required=True, help='the total number of rows')
+    generate_parser.add_argument('-o', '--output', required=True,
+                                 help="the path of the files, such as 'data/part-{shard:05d}.parquet'")
+    generate_parser.add_argument('-s', '--shards', type=int, help='the number of files (default: the workers)')
+    generate_parser.add_argument('-w', '--workers', type=int, help='the number of processes (default: the CPUs)')
+    generate_parser.add_argument('--seed', type=int, help='the seed of the shards (default: random, reported)')
+    generate_parser.add_argument('-b', '--batch-size', type=int, default=65536,
+                                 help='the rows generated at a time (default: %(default)s)')
+    generate_parser.add_argument('-f', '--format', choices=sorted(WRITERS),
+                                 help='the format of the files (default: the extension of the output)')
+    generate_parser.add_argument('-q', '--quiet', action='store_true', help='do not report the progress')
+
+    args = parser.parse_args(argv)
+    if args.command != 'generate':
+        parser.print_help()
+        return 2
+
+    seed = numpy.random.SeedSequence(args.seed)
+    file = None if args.quiet else sys.stderr
+    if file is not None:
+        print('seed: {}'.format(seed.entropy), file=file)
+    paths = generate(load(args.spec), args.output, args.rows, shards=args.shards, workers=args.workers, seed=seed,
+                     batch_size=args.batch_size, format=args.format, file=file)
+    for path in paths:
+        print(path)
+    return 0
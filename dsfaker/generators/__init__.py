@@ -7,3 +7,6 @@ from .date import *
 from .series import *
 from .timeseries import *
 from .trigonometric import *
+from .categorical import *
+from .table import *
+from .profiling import *
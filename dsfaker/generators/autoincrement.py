@@ -1,6 +1,7 @@
 import numpy
 
 from . import Generator
+from .base import _into, _takes_out
 
 
 class Autoincrement(Generator):
@@ -14,24 +15,44 @@ class Autoincrement(Generator):
         self.offset += 1
         return self.start + (self.offset - 1) * self.step
 
-    def get_batch(self, batch_size: int):
+    def seek(self, n: int):
+        self.offset = n
+
+    def get_range(self, start: int, stop: int, out: numpy.ndarray=None):
+        return self._range(start, stop - start, out)
+
+    def get_batch(self, batch_size: int, out: numpy.ndarray=None):
         self.offset += batch_size
-        return numpy.arange(start=self.start + (self.offset - batch_size) * self.step,
-                            stop=self.start + self.offset * self.step,
-                            step=self.step,
-                            dtype=self.dtype)
+        return self._range(self.offset - batch_size, batch_size, out)
+
+    def _range(self, offset: int, batch_size: int, out: numpy.ndarray=None):
+        first = self.start + offset * self.step
+        if out is not None and batch_size > 0 and out.dtype.kind in 'iu' and numpy.dtype(self.dtype).kind in 'iu':
+            # Integer sequences are exactly rebuilt by a cumulative sum, without a temporary array
+            out.fill(self.step)
+            out[0] = first
+            return numpy.cumsum(out, out=out)
+        # The stop is half a step after the last value so that rounding errors cannot add or remove a value
+        return _into(numpy.arange(start=first,
+                                  stop=first + (batch_size - 0.5) * self.step,
+                                  step=self.step,
+                                  dtype=self.dtype), out)
 
 
 class AutoincrementWithGenerator(Generator):
-    def __init__(self, start: float, generator: Generator):
+    def __init__(self, start: float, generator: Generator, dtype: numpy.dtype=None):
         """
 
         :param start: The value to start with
         :param generator: A Generator
+        :param dtype: the dtype in which the values are accumulated (and returned), such as numpy.int64 for integer
+            steps or numpy.longdouble to reduce the drift of long float walks; inferred from the first batch by default
         """
         self.start = start
         self.generator = generator
-        self.current_val = start
+        self.dtype = None if dtype is None else numpy.dtype(dtype)
+        self.current_val = start if dtype is None else self.dtype.type(start)
+        self._takes_out = None
 
     def get_single(self):
         tmp = self.generator.get_single()
@@ -39,9 +60,30 @@ class AutoincrementWithGenerator(Generator):
         self.current_val += tmp
         return old_val
 
-    def get_batch(self, batch_size: int):
-        random_incremental = self.current_val + numpy.cumsum(self.generator.get_batch(batch_size=batch_size))
-        random_incremental = numpy.insert(random_incremental, 0, self.current_val)
-        self.current_val = random_incremental[-1]
-        return random_incremental[:-1]
+    def get_batch(self, batch_size: int, out: numpy.ndarray=None):
+        if self.dtype is None:
+            increments = self.generator.get_batch(batch_size=batch_size)
+            increments = numpy.asarray(increments)
+            # As numpy.cumsum promotes (small integers to the default integer), with the dtype (not the value) of start
+            self.dtype = numpy.result_type(numpy.cumsum(increments[:0]).dtype, numpy.asarray(self.current_val).dtype)
+            res = numpy.array(increments, dtype=self.dtype)
+        else:
+            if self._takes_out is None:
+                self._takes_out = _takes_out(self.generator)
+            res = out if out is not None and out.dtype == self.dtype else numpy.empty(batch_size, dtype=self.dtype)
+            if self._takes_out:
+                increments = self.generator.get_batch(batch_size=batch_size, out=res)
+            else:
+                increments = self.generator.get_batch(batch_size=batch_size)
+            if increments is not res:
+                res[...] = increments
+        if batch_size == 0:
+            return _into(res, out)
 
+        # Exclusive scan in place: the increments are shifted by one, behind the current value
+        last = res[-1]
+        res[1:] = res[:-1]
+        res[0] = self.current_val
+        numpy.cumsum(res, out=res)
+        self.current_val = res[-1] + last
+        return res if res is out else _into(res, out)
@@ -1,16 +1,46 @@
 # -*- coding: utf-8 -*-
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import copy
-from functools import reduce
+from functools import reduce, wraps
+import inspect
+import multiprocessing
 import operator
-from typing import Iterable
+import os
+import pickle
+import queue
+import threading
+import traceback
+from typing import AsyncIterator, Iterable
 
 import numpy
 
 
+def _recording_init(init):
+    """
+    Wraps the __init__ of a Generator class so that the arguments an instance was created with are kept,
+    for dsfaker.spec to describe it.
+    """
+    @wraps(init)
+    def __init__(self, *args, **kwargs):
+        # Only the outermost __init__ records: the ones called with super().__init__ get derived arguments
+        if '_init_args' not in self.__dict__:
+            self._init_args = {'args': args, 'kwargs': kwargs}
+        init(self, *args, **kwargs)
+    return __init__
+
+
 class Generator():
     """
     Test
     """
+    dtype = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if '__init__' in cls.__dict__:
+            cls.__init__ = _recording_init(cls.__init__)
+
     def get_single(self):
         """
         A function that returns a single element.
@@ -22,18 +52,258 @@ class Generator():
         while True:
             yield self.get_single()
 
-    def get_batch(self, batch_size: int) -> numpy.array:
+    def get_batch(self, batch_size: int, out: numpy.ndarray=None) -> numpy.array:
         """
         A function that returns a single batch of elements.
+
+        The default implementation preallocates the batch with the declared `dtype` and fills it through
+        `_fill_batch`, without an intermediate list. The elements of a Generator that does not declare its dtype (or
+        declares a string dtype without width) are collected and given to numpy.asarray, so that the dtype of the
+        batch fits all of them.
+
+        :param batch_size: the number of elements to return
+        :param out: an array of batch_size elements to write the batch into, returned instead of a new array
+        """
+        if out is not None:
+            self._fill_batch(out)
+            return out
+        dtype = None if self.dtype is None else numpy.dtype(self.dtype)
+        if dtype is None or (dtype.kind in 'SU' and dtype.itemsize == 0):
+            return numpy.asarray([self.get_single() for _ in range(batch_size)], dtype=dtype)
+        if batch_size == 0:
+            return numpy.empty(0, dtype=dtype)
+        first = self.get_single()
+        out = numpy.empty((batch_size,) + numpy.shape(first), dtype=dtype)
+        out[0] = first
+        self._fill_batch(out[1:])
+        return out
+
+    def _fill_batch(self, out: numpy.ndarray):
+        """
+        Fills a preallocated array with elements, through numpy.fromiter for an array of scalars, one row at a time
+        otherwise. Generators that have a faster way of producing elements can override it.
         """
-        res = []
-        for _ in range(batch_size):
-            res.append(self.get_single())
-        return numpy.asarray(res)
+        if out.ndim == 1:
+            out[...] = numpy.fromiter((self.get_single() for _ in range(len(out))), dtype=out.dtype, count=len(out))
+            return
+        for i in range(len(out)):
+            out[i] = self.get_single()
 
-    def stream_batch(self, batch_size: int) -> Iterable:
+    def stream_batch(self, batch_size: int, buffers: int=None) -> Iterable:
+        """
+        Yields batches of batch_size elements.
+
+        :param batch_size: the number of elements of each batch
+        :param buffers: if given, batches are written into a pool of that many arrays used in turn instead of being
+            allocated at each iteration: a yielded batch is overwritten `buffers` iterations later (but strings, which
+            are always allocated, as a batch may hold longer ones than the arrays of the pool)
+        """
+        if not buffers:
+            while True:
+                yield self.get_batch(batch_size=batch_size)
+
+        pool = []
+        i = 0
         while True:
-            yield self.get_batch(batch_size=batch_size)
+            if len(pool) < buffers:
+                batch = self.get_batch(batch_size=batch_size)
+                if isinstance(batch, numpy.ndarray) and batch.dtype.kind in 'SU':
+                    yield batch
+                    yield from self.stream_batch(batch_size=batch_size)
+                # The first batches are copied so that the pool never holds an array owned by a Generator
+                pool.append(copy.deepcopy(batch))
+            else:
+                self.get_batch(batch_size=batch_size, out=pool[i % buffers])
+            yield pool[i % buffers]
+            i += 1
+
+    def parallel_stream_batch(self, batch_size: int, workers: int=None, seed=None, prefetch: int=2) -> Iterable:
+        """
+        Yields batches of batch_size elements generated by worker processes.
+
+        The Generator is sent once, as its spec when the graph can be described (see dsfaker.spec), else pickled.
+        Every worker rebuilds its own copy, reseeds it with one of the children spawned from
+        `numpy.random.SeedSequence(seed)` and generates batches into a bounded queue. Batches are yielded from the
+        workers in turn, so a seed and a number of workers always give the same stream.
+        The workers generate independent streams: this Generator itself is left untouched.
+        The parts of the tree supporting seek (such as Autoincrement) are interleaved instead: each worker moves them
+        to the elements of its own batches, so that the stream holds their elements from 0 in order, without repeats.
+
+        :param batch_size: the number of elements of each batch
+        :param workers: the number of worker processes, the number of CPUs by default
+        :param seed: the seed (or numpy.random.SeedSequence) from which the workers are reseeded
+        :param prefetch: the number of batches each worker generates in advance
+        """
+        workers = workers or os.cpu_count()
+        payload = _payload(self)
+        seed = seed if isinstance(seed, numpy.random.SeedSequence) else numpy.random.SeedSequence(seed)
+        context = multiprocessing.get_context()
+        queues = [context.Queue(maxsize=prefetch) for _ in range(workers)]
+        processes = [context.Process(target=_stream_worker, args=(payload, worker_seed, batch_size, queue, i, workers),
+                                     daemon=True)
+                     for i, (worker_seed, queue) in enumerate(zip(seed.spawn(workers), queues))]
+        for process in processes:
+            process.start()
+        try:
+            i = 0
+            while True:
+                batch = queues[i % workers].get()
+                if isinstance(batch, BaseException):
+                    raise batch
+                yield batch
+                i += 1
+        finally:
+            for process in processes:
+                process.terminate()
+                process.join()
+
+    async def aget_single(self):
+        """
+        Coroutine returning a single element.
+        By default, calls get_single and then lets the event loop run its other tasks: Generators that wait
+        (such as TimeDelayedGenerator) override it to wait without blocking the event loop.
+        """
+        res = self.get_single()
+        await asyncio.sleep(0)
+        return res
+
+    async def aget_batch(self, batch_size: int, out: numpy.ndarray=None) -> numpy.array:
+        """
+        Coroutine returning a single batch of elements, see aget_single.
+
+        :param batch_size: the number of elements to return
+        :param out: an array of batch_size elements to write the batch into, returned instead of a new array
+        """
+        res = self.get_batch(batch_size=batch_size, out=out)
+        await asyncio.sleep(0)
+        return res
+
+    async def astream_single(self) -> AsyncIterator:
+        """
+        Asynchronously yields one element at a time.
+        """
+        while True:
+            yield await self.aget_single()
+
+    async def astream_batch(self, batch_size: int) -> AsyncIterator:
+        """
+        Asynchronously yields batches of batch_size elements.
+
+        :param batch_size: the number of elements of each batch
+        """
+        while True:
+            yield await self.aget_batch(batch_size=batch_size)
+
+    def prefetch_stream_batch(self, batch_size: int, prefetch: int=2, buffers: int=None, process: bool=False) -> Iterable:
+        """
+        Yields batches of batch_size elements generated in the background, so that generating the next batches
+        overlaps with consuming the current one.
+
+        With threads (the default), this Generator is used by the background thread until the stream is closed and
+        should not be used elsewhere meanwhile. With a process, the Generator is pickled and the worker continues its
+        stream from a copy: this Generator itself is left untouched.
+        Exceptions raised while generating are raised by the stream.
+
+        :param batch_size: the number of elements of each batch
+        :param prefetch: the maximum number of batches generated in advance
+        :param buffers: with threads, if given, batches are written into a pool of arrays instead of being allocated:
+            a yielded batch is overwritten `buffers` iterations later (see `stream_batch`)
+        :param process: generate in a worker process instead of a thread
+        """
+        if prefetch < 1:
+            raise ValueError("prefetch should be at least 1")
+
+        if process:
+            context = multiprocessing.get_context()
+            batches = context.Queue(maxsize=prefetch)
+            worker = context.Process(target=_stream_worker, args=(('pickle', pickle.dumps(self)), None, batch_size, batches),
+                                     daemon=True)
+            worker.start()
+            try:
+                while True:
+                    batch = batches.get()
+                    if isinstance(batch, BaseException):
+                        raise batch
+                    yield batch
+            finally:
+                worker.terminate()
+                worker.join()
+
+        # The producer can be prefetch + 1 batches ahead of the consumer: one being generated, prefetch in the queue
+        pool = buffers + prefetch + 1 if buffers else None
+        batches = queue.Queue(maxsize=prefetch)
+        stop = threading.Event()
+        worker = threading.Thread(target=self._prefetch_worker, args=(batch_size, pool, batches, stop), daemon=True)
+        worker.start()
+        try:
+            while True:
+                batch = batches.get()
+                if isinstance(batch, BaseException):
+                    raise batch
+                yield batch
+        finally:
+            stop.set()
+            # Unblocks a producer waiting for room in the queue
+            while worker.is_alive():
+                try:
+                    batches.get(timeout=0.01)
+                except queue.Empty:
+                    pass
+            worker.join()
+
+    def _prefetch_worker(self, batch_size: int, buffers: int, batches: queue.Queue, stop: threading.Event):
+        try:
+            for batch in self.stream_batch(batch_size=batch_size, buffers=buffers):
+                if stop.is_set():
+                    return
+                batches.put(batch)
+        except Exception as e:
+            batches.put(e)
+
+    def reseed(self, seed=None):
+        """
+        Reseeds every pseudo-random Generator this Generator draws from.
+        Each child is reseeded with its own child of `numpy.random.SeedSequence(seed)`, so that no two streams overlap.
+
+        :param seed: an int, a sequence of ints or a numpy.random.SeedSequence
+        """
+        seed = seed if isinstance(seed, numpy.random.SeedSequence) else numpy.random.SeedSequence(seed)
+        children = self._children()
+        for child, child_seed in zip(children, seed.spawn(len(children))):
+            child.reseed(child_seed)
+
+    def seek(self, n: int):
+        """
+        Moves this Generator to its n-th element (the first one being 0), so that it is the next element returned.
+        Only implemented by Generators whose elements only depend on their index.
+
+        :param n: the index of the next element
+        """
+        raise NotImplementedError("seek not implemented")
+
+    def get_range(self, start: int, stop: int, out: numpy.ndarray=None) -> numpy.array:
+        """
+        Returns the elements start (inclusive) to stop (exclusive) of this Generator, without generating the previous
+        ones and without changing its state, so that shards of a stream can be generated independently.
+        Only implemented by Generators whose elements only depend on their index.
+
+        :param start: the index of the first element
+        :param stop: the index after the last element
+        :param out: an array of stop - start elements to write the elements into, returned instead of a new array
+        """
+        raise NotImplementedError("get_range not implemented")
+
+    def _children(self) -> list:
+        """
+        Returns the Generators this Generator draws from, found in its attributes.
+        """
+        children = []
+        for value in vars(self).values():
+            if isinstance(value, Generator):
+                children.append(value)
+            elif isinstance(value, (list, tuple)):
+                children.extend(v for v in value if isinstance(v, Generator))
+        return children
 
     def copy(self):
         return copy.deepcopy(self)
@@ -94,6 +364,78 @@ class Generator():
 
 
 
+def _seek_tree(generator: Generator, n: int, seen: set=None) -> bool:
+    """
+    Moves to their n-th element the largest parts of a Generator tree that support seek: a node that does not
+    (such as an operator with a random child) has its children moved instead, so that the index-based Generators of
+    the tree (such as Autoincrement) are moved whatever their place, and the random ones are left as they are.
+    Returns whether any part of the tree was moved.
+    """
+    seen = set() if seen is None else seen
+    if id(generator) in seen:
+        return False
+    seen.add(id(generator))
+    try:
+        generator.seek(n)
+        return True
+    except NotImplementedError:
+        pass
+    moved = False
+    for child in generator._children():
+        moved = _seek_tree(child, n, seen) or moved
+    return moved
+
+
+def _payload(generator: Generator) -> tuple:
+    """
+    Returns what worker processes rebuild a Generator from: its spec (see dsfaker.spec) when the graph can be
+    described, which is smaller and quicker to rebuild than its pickle, else the pickled Generator.
+    """
+    from .. import spec
+    try:
+        return 'spec', spec.dumps(generator)
+    except ValueError:
+        return 'pickle', pickle.dumps(generator)
+
+
+def _rebuild(payload: tuple) -> Generator:
+    """
+    Rebuilds a Generator in a worker process from the payload of _payload.
+    """
+    kind, data = payload
+    if kind == 'spec':
+        from .. import spec
+        return spec.loads(data)
+    return pickle.loads(data)
+
+
+def _stream_worker(payload: tuple, seed: numpy.random.SeedSequence, batch_size: int, batches, index: int=0,
+                   workers: int=1):
+    """
+    Runs in a worker process of Generator.parallel_stream_batch (or prefetch_stream_batch, without seed):
+    puts batches, or the exception raised, into the batches queue.
+    With several workers, the parts of the tree supporting seek are moved before every batch to the elements of the
+    index-th worker: the batches index, index + workers, ...
+    """
+    try:
+        generator = _rebuild(payload)
+        if seed is not None:
+            generator.reseed(seed)
+        seekable = workers > 1
+        i = 0
+        while True:
+            if seekable:
+                seekable = _seek_tree(generator, (i * workers + index) * batch_size)
+            batches.put(generator.get_batch(batch_size=batch_size))
+            i += 1
+    except Exception as e:
+        try:
+            pickle.dumps(e)
+        except Exception:
+            e = RuntimeError(traceback.format_exc())
+        batches.put(e)
+
+
 class BoundedGenerator(Generator):
     bounded = True
     lb = None
@@ -112,12 +454,39 @@ class ReduceOperator(Generator):
             return x
         return reduce(lambda a, b: self.reduce_lambda(_get_single(a), _get_single(b)), self.generators)
 
-    def get_batch(self, batch_size: int) -> numpy.array:
+    def get_batch(self, batch_size: int, out: numpy.ndarray=None) -> numpy.array:
         def _get_batch(x, batch_size):
             if isinstance(x, Generator):
                 return x.get_batch(batch_size=batch_size)
             return x
-        return reduce(lambda a, b: self.reduce_lambda(_get_batch(a, batch_size=batch_size), _get_batch(b, batch_size=batch_size)), self.generators)
+        ufunc = _UFUNCS.get(self.reduce_lambda)
+        if out is None or ufunc is None or len(self.generators) < 2:
+            return _into(reduce(lambda a, b: self.reduce_lambda(_get_batch(a, batch_size=batch_size), _get_batch(b, batch_size=batch_size)), self.generators), out)
+
+        # The last operation writes directly into out
+        res = _get_batch(self.generators[0], batch_size=batch_size)
+        for generator in self.generators[1:-1]:
+            res = self.reduce_lambda(res, _get_batch(generator, batch_size=batch_size))
+        return ufunc(res, _get_batch(self.generators[-1], batch_size=batch_size), out=out, casting='unsafe')
+
+    def seek(self, n: int):
+        for generator in self.generators:
+            if isinstance(generator, Generator):
+                generator.seek(n)
+
+    def get_range(self, start: int, stop: int, out: numpy.ndarray=None) -> numpy.array:
+        def _get_range(x):
+            if isinstance(x, Generator):
+                return x.get_range(start, stop)
+            return x
+        return _into(reduce(lambda a, b: self.reduce_lambda(_get_range(a), _get_range(b)), self.generators), out)
+
+    def compile(self) -> 'CompiledOperator':
+        """
+        Returns a Generator evaluating this tree of operators through a plan built once.
+        See CompiledOperator.
+        """
+        return CompiledOperator(self)
 
 
 class AddOperator(ReduceOperator):
@@ -199,20 +568,281 @@ class XorOperator(ReduceOperator):
         return '^'
 
 
+def _into(values, out: numpy.ndarray=None):
+    """
+    Returns values, or copies them into out and returns out when it is given.
+    Used by Generators that cannot write their batches directly into a provided array.
+    """
+    if out is None:
+        return values
+    out[...] = values
+    return out
+
+
+def _takes_out(generator: Generator) -> bool:
+    """
+    Returns whether the get_batch of a Generator takes out: the ones written before it did must be called without it.
+    """
+    try:
+        parameters = inspect.signature(generator.get_batch).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(p.name == 'out' or p.kind == p.VAR_KEYWORD for p in parameters)
+
+
+_UFUNCS = {
+    operator.add: numpy.add,
+    operator.sub: numpy.subtract,
+    operator.truediv: numpy.true_divide,
+    operator.floordiv: numpy.floor_divide,
+    operator.mul: numpy.multiply,
+    operator.pow: numpy.power,
+    operator.mod: numpy.remainder,
+    operator.and_: numpy.bitwise_and,
+    operator.or_: numpy.bitwise_or,
+    operator.xor: numpy.bitwise_xor,
+}
+
+
+def _signature(x):
+    if isinstance(x, numpy.ndarray):
+        # 0-d arrays take part in value-based casting, their dtype alone does not tell the result dtype
+        return (x.dtype, x.shape) if x.ndim > 0 else None
+    return type(x)
+
+
+class CompiledOperator(Generator):
+    def __init__(self, generator: ReduceOperator):
+        """
+        Evaluates a tree of ReduceOperators (e.g. `a * 3 + b - c`) with a stack program built once from the tree.
+
+        Leaves (Generators other than the built-in operators, and constants) are evaluated in the same order as the
+        tree would evaluate them, so both give the same values.
+        Intermediate results are written through ufunc `out=` arguments into scratch buffers kept between calls
+        (one per depth of the stack, not one per node): only the returned batch is allocated at each call.
+
+        :param generator: the root of the tree of operators
+        """
+        self.generator = generator
+        self.program = []
+        self._compile(generator)
+        self._signatures = {}
+        self._scratch = {}
+
+    def _compile(self, node):
+        ufunc = _UFUNCS.get(node.reduce_lambda) if isinstance(node, ReduceOperator) else None
+        if ufunc is None:
+            self.program.append((None, node))
+            return
+        for i, child in enumerate(node.generators):
+            self._compile(child)
+            if i > 0:
+                self.program.append((ufunc, None))
+
+    def get_single(self):
+        return self.generator.get_single()
+
+    def seek(self, n: int):
+        self.generator.seek(n)
+
+    def get_range(self, start: int, stop: int, out: numpy.ndarray=None) -> numpy.array:
+        return self.generator.get_range(start, stop, out=out)
+
+    def get_batch(self, batch_size: int, out: numpy.ndarray=None) -> numpy.array:
+        if len(self.program) == 1:
+            leaf = self.program[0][1]
+            return leaf.get_batch(batch_size=batch_size, out=out) if isinstance(leaf, Generator) else _into(leaf, out)
+
+        stack = []
+        # Steps at the bottom of the stack accumulate directly into out
+        results = {} if out is None else {(0, out.dtype): out}
+        last = len(self.program) - 1
+        for step, (ufunc, leaf) in enumerate(self.program):
+            if ufunc is None:
+                stack.append(leaf.get_batch(batch_size=batch_size) if isinstance(leaf, Generator) else leaf)
+            else:
+                b = stack.pop()
+                a = stack.pop()
+                if step == last and out is not None:
+                    stack.append(ufunc(a, b, out=out, casting='unsafe'))
+                else:
+                    stack.append(self._apply(step, ufunc, a, b, results if len(stack) == 0 else self._scratch, len(stack)))
+        return stack[0]
+
+    def _apply(self, step, ufunc, a, b, buffers, depth):
+        signature = (_signature(a), _signature(b))
+        known = self._signatures.get(step)
+        if known is None or known[0] != signature or None in signature:
+            res = ufunc(a, b)
+            if isinstance(res, numpy.ndarray):
+                self._signatures[step] = (signature, res.dtype, res.shape)
+            return res
+
+        _, dtype, shape = known
+        out = buffers.get((depth, dtype))
+        if out is None or out.shape != shape:
+            out = numpy.empty(shape, dtype=dtype)
+            buffers[(depth, dtype)] = out
+        return ufunc(a, b, out=out)
+
+
 class Distribution(Generator):
     bounded = None
     continuous = None
     lb = None
     ub = None
 
+    # Smallest slice filled by a thread, below which splitting a batch costs more than it saves
+    _THREADS_MIN_SLICE = 1 << 16
+
+    def __init__(self, seed=None, bit_generator=None, rng=None, legacy: bool=False, threads: int=None,
+                 counter: bool=False, block_size: int=4096):
+        """
+        Values are drawn from a `numpy.random.Generator`, stored in the `rs` attribute.
+
+        :param seed: the seed of the bit generator (an int, a sequence of ints or a numpy.random.SeedSequence)
+        :param bit_generator: the numpy.random.BitGenerator to use, as a class, an instance or a name
+            ('PCG64', 'PCG64DXSM', 'SFC64', 'Philox', 'MT19937'); PCG64 by default
+        :param rng: an existing numpy.random.Generator (or numpy.random.RandomState) to draw values from,
+            used instead of seed and bit_generator
+        :param legacy: draw values from a numpy.random.RandomState, to reproduce the values given by a seed
+            before dsfaker used numpy.random.Generator
+        :param threads: split large batches into that many slices, each one filled in its own thread from an
+            independent stream spawned from the main one; a seed and a number of threads always give the same values
+        :param counter: draw values by blocks of block_size rows, the block b being drawn from a Philox keyed by the
+            seed with the counter b, so that any range of rows can be drawn (with get_range or seek) without drawing
+            the previous ones, and gives the same values as a sequential run
+        :param block_size: the number of rows of a block in counter mode
+        """
+        self.counter = counter
+        if counter:
+            if rng is not None or legacy or bit_generator is not None or (threads is not None and threads > 1):
+                raise ValueError("counter mode draws from Philox: it cannot be used with rng, legacy, bit_generator "
+                                 "or threads")
+            self.block_size = block_size
+            self.position = 0
+            self.reseed(seed)
+            self.legacy = False
+            self.threads = None
+            return
+
+        if rng is None:
+            if legacy:
+                rng = numpy.random.RandomState(seed=seed)
+            else:
+                if bit_generator is None:
+                    bit_generator = numpy.random.PCG64
+                elif isinstance(bit_generator, str):
+                    bit_generator = getattr(numpy.random, bit_generator)
+                if not isinstance(bit_generator, numpy.random.BitGenerator):
+                    bit_generator = bit_generator(seed)
+                rng = numpy.random.Generator(bit_generator)
+        self.rs = rng
+        self.legacy = isinstance(rng, numpy.random.RandomState)
+        if threads is not None and threads > 1 and self.legacy:
+            raise ValueError("threads needs a numpy.random.Generator, not a legacy RandomState")
+        self.threads = threads
+
+    def reseed(self, seed=None):
+        if self.counter:
+            seed = seed if isinstance(seed, numpy.random.SeedSequence) else numpy.random.SeedSequence(seed)
+            self.key = seed.generate_state(2, numpy.uint64)
+            self.rs = None
+            self._block = (None, None)
+        elif self.legacy:
+            # RandomState seeds an int as the old numpy.random did: only a SeedSequence goes through MT19937
+            if isinstance(seed, numpy.random.SeedSequence):
+                seed = numpy.random.MT19937(seed)
+            self.rs = numpy.random.RandomState(seed)
+        else:
+            self.rs = numpy.random.Generator(type(self.rs.bit_generator)(seed))
+
+    def _native_out(self, out: numpy.ndarray) -> bool:
+        """
+        Tells whether the numpy.random.Generator methods can write directly into out.
+        """
+        return not self.legacy and out.dtype == numpy.float64 and out.flags.c_contiguous and out.flags.aligned \
+            and out.flags.writeable
+
     def _get(self, size=None):
         raise NotImplementedError("_get not implemented!")
 
     def get_single(self) -> float:
+        if self.counter:
+            self.position += 1
+            return self._get_counter_block((self.position - 1) // self.block_size)[(self.position - 1) % self.block_size]
         return self._get()
 
-    def get_batch(self, batch_size: int) -> numpy.array:
-        return self._get(size=batch_size)
+    def get_batch(self, batch_size: int, out: numpy.ndarray=None) -> numpy.array:
+        if self.counter:
+            self.position += batch_size
+            # Not self.get_range: the subclasses post-processing get_range would do it twice
+            return Distribution.get_range(self, self.position - batch_size, self.position, out=out)
+        if self.threads is not None and self.threads > 1 and batch_size >= 2 * self._THREADS_MIN_SLICE:
+            return self._get_batch_threaded(batch_size, out)
+        if out is None:
+            return self._get(size=batch_size)
+        self._fill_batch(out)
+        return out
+
+    def _fill_batch(self, out: numpy.ndarray):
+        out[...] = self._get(size=len(out))
+
+    def seek(self, n: int):
+        if not self.counter:
+            raise NotImplementedError("seek needs counter=True")
+        self.position = n
+
+    def get_range(self, start: int, stop: int, out: numpy.ndarray=None) -> numpy.array:
+        if not self.counter:
+            raise NotImplementedError("get_range needs counter=True")
+        first, last = start // self.block_size, max(stop - 1, start) // self.block_size
+        if out is None:
+            block = self._get_counter_block(first)
+            out = numpy.empty((max(stop - start, 0),) + block.shape[1:], dtype=block.dtype)
+        filled = 0
+        for b in range(first, last + 1):
+            lo = max(start - b * self.block_size, 0)
+            hi = min(stop - b * self.block_size, self.block_size)
+            if hi > lo:
+                out[filled:filled + hi - lo] = self._get_counter_block(b)[lo:hi]
+                filled += hi - lo
+        return out
+
+    def _get_counter_block(self, b: int) -> numpy.ndarray:
+        """
+        Returns the values of the block b in counter mode. The last block is kept, for the batches smaller than a block.
+        """
+        if self._block[0] != b:
+            rng = numpy.random.Generator(numpy.random.Philox(key=self.key, counter=[0, b, 0, 0]))
+            self._block = (b, numpy.asarray(self._with_rng(rng)._get(size=self.block_size)))
+        return self._block[1]
+
+    def _with_rng(self, rng):
+        """
+        Returns a shallow copy of this Distribution drawing its values from rng, in a single thread.
+        """
+        clone = copy.copy(self)
+        clone.rs = rng
+        clone.threads = None
+        return clone
+
+    def _get_batch_threaded(self, batch_size: int, out: numpy.ndarray=None) -> numpy.array:
+        nb_slices = min(self.threads, batch_size // self._THREADS_MIN_SLICE)
+        bit_generator = type(self.rs.bit_generator)
+        # The streams of the slices are spawned from values drawn from the main stream, which advances it
+        seed = numpy.random.SeedSequence(self.rs.integers(0, 2 ** 63, size=4).tolist())
+        clones = [self._with_rng(numpy.random.Generator(bit_generator(s))) for s in seed.spawn(nb_slices)]
+
+        if out is None:
+            # The dtype and shape of an element are given by a throwaway draw that leaves the streams untouched
+            sample = numpy.asarray(self._with_rng(numpy.random.Generator(bit_generator(0)))._get(size=1))
+            out = numpy.empty((batch_size,) + sample.shape[1:], dtype=sample.dtype)
+
+        bounds = [batch_size * i // nb_slices for i in range(nb_slices + 1)]
+        with ThreadPoolExecutor(max_workers=nb_slices) as executor:
+            list(executor.map(lambda i: clones[i]._fill_batch(out[bounds[i]:bounds[i + 1]]), range(nb_slices)))
+        return out
 
 
 class DistributionUnbounded(Distribution):
@@ -226,3 +856,4 @@ class DistributionNonNegative(Distribution):
 
 class DistributionBounded(Distribution, BoundedGenerator):
     bounded = True
+
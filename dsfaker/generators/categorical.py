@@ -0,0 +1,120 @@
+import numpy
+
+from .base import Distribution, _into
+
+__all__ = ['CategoricalArray', 'ValueChoice']
+
+
+def _code_dtype(nb_categories: int) -> numpy.dtype:
+    """
+    Returns the smallest unsigned integer dtype able to hold the codes of nb_categories categories.
+    """
+    return numpy.min_scalar_type(max(nb_categories - 1, 0))
+
+
+def _categorical(codes: numpy.ndarray, categories: numpy.ndarray, out=None):
+    """
+    Returns codes into categories as a CategoricalArray, with the smallest dtype for the codes.
+    The codes are written into out when given: an array of codes, or a CategoricalArray (such as a batch returned
+    before), which is then returned.
+    """
+    if isinstance(out, CategoricalArray):
+        _into(codes, out.codes)
+        out.categories = categories
+        return out
+    return CategoricalArray(_into(codes.astype(_code_dtype(len(categories)), copy=False), out), categories)
+
+
+class CategoricalArray:
+    def __init__(self, codes: numpy.ndarray, categories: numpy.ndarray):
+        """
+        An array of values stored as integer codes into a shared array of categories.
+        The values themselves are only built when decoded.
+
+        :param codes: the index of the category of every value
+        :param categories: the distinct values
+        """
+        self.codes = codes
+        self.categories = categories
+
+    @property
+    def dtype(self) -> numpy.dtype:
+        return self.categories.dtype
+
+    @property
+    def shape(self) -> tuple:
+        return self.codes.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.categories.nbytes
+
+    def decode(self) -> numpy.ndarray:
+        """
+        Returns the values as a numpy array.
+        """
+        return self.categories[self.codes]
+
+    def __array__(self, dtype=None, copy=None):
+        values = self.decode()
+        return values if dtype is None else values.astype(dtype)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __iter__(self):
+        return iter(self.decode())
+
+    def __getitem__(self, item):
+        codes = self.codes[item]
+        if isinstance(codes, numpy.ndarray):
+            return CategoricalArray(codes, self.categories)
+        return self.categories[codes]
+
+    def __repr__(self):
+        return 'CategoricalArray(codes={!r}, categories={!r})'.format(self.codes, self.categories)
+
+
+class ValueChoice(Distribution):
+    bounded = False
+    continuous = False
+
+    def __init__(self, values, probabilities=None, categorical: bool=False, seed=None, **kwargs):
+        """
+        Draws values from a list of values, uniformly or with the given probabilities.
+
+        :param values: the values to draw from
+        :param probabilities: the probability of each value, uniform by default
+        :param categorical: return batches as CategoricalArray (codes into values) instead of arrays of values; out
+            can be an array of codes, or a CategoricalArray returned before, whose codes are then reused
+        :param seed: the seed of the draws (see Distribution)
+        """
+        self.values = numpy.asarray(values)
+        self.probabilities = probabilities
+        self.categorical = categorical
+        self.dtype = self.values.dtype
+        super().__init__(seed=seed, **kwargs)
+
+    def _get(self, size=None):
+        """
+        Returns the codes (indexes into values) of the values drawn.
+        """
+        if self.probabilities is not None:
+            return self.rs.choice(len(self.values), p=self.probabilities, size=size)
+        if self.legacy:
+            return self.rs.randint(0, len(self.values), size=size)
+        return self.rs.integers(0, len(self.values), size=size)
+
+    def get_single(self):
+        return self.values[super().get_single()]
+
+    def get_batch(self, batch_size: int, out: numpy.ndarray=None):
+        return self._decode(super().get_batch(batch_size), out)
+
+    def get_range(self, start: int, stop: int, out: numpy.ndarray=None):
+        return self._decode(super().get_range(start, stop), out)
+
+    def _decode(self, codes: numpy.ndarray, out: numpy.ndarray=None):
+        if not self.categorical:
+            return _into(self.values[codes], out)
+        return _categorical(codes, self.values, out)
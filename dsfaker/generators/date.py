@@ -1,6 +1,8 @@
 import numpy
 
-from . import Generator, ScalingOperator, BoundedGenerator
+from dsfaker.exceptions import NotCompatibleGeneratorException
+from . import Generator, BoundedGenerator
+from .distributions import Uniform, RandomSample
 
 
 class RandomDatetime(Generator):
@@ -8,18 +10,46 @@ class RandomDatetime(Generator):
         """
         A timezone-aware class to generate datetimes between start and end (inclusive) following a certain distribution
 
+        Datetimes are start plus an integer number of units. When generator is a Uniform or a RandomSample, these
+        offsets are drawn directly as int64 from its random generator, exact whatever the span. Otherwise the values
+        of generator are mapped from [lb, ub] to [0, span] and rounded to the nearest unit.
+
+        :param generator: the distribution of the datetimes
         :param start: The starting date (inclusive)
         :param end: The ending date (inclusive)
         :param unit: The time unit to use for the distribution ('Y', 'M', 'W', 'D', 'h', 'm', 's', 'us', 'ms', 'ns', 'ps', 'fs', 'as')
         """
-        self.rnb = ScalingOperator(generator=generator, lb=0, ub=(end - start) / numpy.timedelta64(1, unit), dtype=numpy.float64)
+        if not isinstance(generator, BoundedGenerator):
+            raise NotCompatibleGeneratorException("RandomDatetime needs a BoundedGenerator.")
+
+        self.generator = generator
         self.start = start
         self.end = end
         self.unit = unit
         self.td_unit = 'timedelta64[{}]'.format(unit)
+        # Integer division keeps the span exact, where a float division would round spans over 2**53 units
+        self.span = int((end - start) // numpy.timedelta64(1, unit))
+        self.scale = self.span / (generator.ub - generator.lb)
+        self.direct = type(generator) in (Uniform, RandomSample) and not generator.counter \
+            and numpy.ndim(generator.lb) == 0 and numpy.ndim(generator.ub) == 0
+
+    def _offsets(self, size=None):
+        if self.direct:
+            rs = self.generator.rs
+            if isinstance(rs, numpy.random.RandomState):
+                return rs.randint(0, self.span + 1, size=size, dtype=numpy.int64)
+            return rs.integers(0, self.span, size=size, dtype=numpy.int64, endpoint=True)
+
+        if size is None:
+            return round((self.generator.get_single() - self.generator.lb) * self.scale)
+        values = numpy.array(self.generator.get_batch(batch_size=size), dtype=numpy.float64)
+        values -= self.generator.lb
+        values *= self.scale
+        numpy.rint(values, out=values)
+        return values.astype(numpy.int64)
 
     def get_single(self):
-        return self.start + numpy.timedelta64(int(round(self.rnb.get_single())), self.unit)
+        return self.start + numpy.timedelta64(int(self._offsets()), self.unit)
 
-    def get_batch(self, batch_size: int):
-        return self.start + self.rnb.get_batch(batch_size=batch_size).astype(self.td_unit)
+    def get_batch(self, batch_size: int, out: numpy.ndarray=None):
+        return numpy.add(self.start, self._offsets(batch_size).view(self.td_unit), out=out)
@@ -1,17 +1,19 @@
+import math
 from typing import Union, Iterable
 
 import numpy
 from numpy import ndarray
-from numpy.random.mtrand import RandomState
 
 from . import DistributionNonNegative, DistributionBounded, DistributionUnbounded
+from .base import _into
+from .categorical import _categorical
 
 
 class Beta(DistributionBounded):
     """
     The Beta distribution is bounded and continuous.
 
-    The implementation is from `numpy.random.mtrand.RandomState.beta <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.beta.html>`_.
+    The implementation is from `numpy.random.Generator.beta <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.beta.html>`_.
 
     Distribution function:
 
@@ -28,10 +30,11 @@ class Beta(DistributionBounded):
     def __init__(self,
                  a: Union[float, ndarray, Iterable[float]],
                  b: Union[float, ndarray, Iterable[float]],
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.a = a
         self.b = b
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.beta(a=self.a,
@@ -43,7 +46,7 @@ class Binomial(DistributionNonNegative):
     """
     The Binomial distribution is non-negative and discrete.
 
-    The implementation is from `numpy.random.mtrand.RandomState.binomial <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.binomial.html>`_.
+    The implementation is from `numpy.random.Generator.binomial <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.binomial.html>`_.
 
     Distribution function:
 
@@ -54,10 +57,11 @@ class Binomial(DistributionNonNegative):
     def __init__(self,
                  n: Union[int, ndarray, Iterable[int]],
                  p: Union[float, ndarray, Iterable[float]],
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.n = n
         self.p = p
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.binomial(n=self.n,
@@ -69,7 +73,7 @@ class BinomialNegative(DistributionNonNegative):
     """
     The negative Binomial distribution is non-negative and discrete.
 
-    The implementation is from `numpy.random.mtrand.RandomState.negative_binomial <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.negative_binomial.html>`_.
+    The implementation is from `numpy.random.Generator.negative_binomial <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.negative_binomial.html>`_.
 
     Distribution function:
 
@@ -80,10 +84,11 @@ class BinomialNegative(DistributionNonNegative):
     def __init__(self,
                  n: Union[int, ndarray, Iterable[int]],
                  p: Union[float, ndarray, Iterable[float]],
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.n = n
         self.p = p
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.negative_binomial(n=self.n,
@@ -95,7 +100,7 @@ class CauchyStandard(DistributionUnbounded):
     """
     The standard Cauchy distribution is unbounded and continuous.
 
-    The implementation is from `numpy.random.mtrand.RandomState.standard_cauchy <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.standard_cauchy.html>`_.
+    The implementation is from `numpy.random.Generator.standard_cauchy <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.standard_cauchy.html>`_.
 
     Distribution function:
 
@@ -103,8 +108,8 @@ class CauchyStandard(DistributionUnbounded):
     """
     continuous = True
 
-    def __init__(self, seed=None):
-        self.rs = RandomState(seed=seed)
+    def __init__(self, seed=None, **kwargs):
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.standard_cauchy(size=size)
@@ -114,7 +119,7 @@ class Chisquare(DistributionNonNegative):
     """
     The Chisquare distribution is non-negative and continuous.
 
-    The implementation is from `numpy.random.mtrand.RandomState.chisquare <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.chisquare.html>`_.
+    The implementation is from `numpy.random.Generator.chisquare <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.chisquare.html>`_.
 
     Distribution function:
 
@@ -124,9 +129,10 @@ class Chisquare(DistributionNonNegative):
 
     def __init__(self,
                  k: Union[int, ndarray, Iterable[int]],
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.k = k
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.chisquare(df=self.k,
@@ -137,7 +143,7 @@ class ChisquareNonCentral(DistributionNonNegative):
     """
     The non-central Chisquare distribution is non-negative and continuous.
 
-    The implementation is from `numpy.random.mtrand.RandomState.noncentral_chisquare <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.noncentral_chisquare.html>`_.
+    The implementation is from `numpy.random.Generator.noncentral_chisquare <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.noncentral_chisquare.html>`_.
 
     Distribution function:
 
@@ -148,10 +154,11 @@ class ChisquareNonCentral(DistributionNonNegative):
     def __init__(self,
                  k: Union[int, ndarray, Iterable[int]],
                  nonc: Union[float, ndarray, Iterable[float]],
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.k = k
         self.nonc = nonc
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.noncentral_chisquare(df=self.k,
@@ -163,7 +170,7 @@ class Dirichlet(DistributionNonNegative):
     """
     The Dirichlet distribution is non-negative and continuous.
 
-    The implementation is from `numpy.random.mtrand.RandomState.dirichlet <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.dirichlet.html>`_.
+    The implementation is from `numpy.random.Generator.dirichlet <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.dirichlet.html>`_.
 
     Distribution function:
 
@@ -173,9 +180,10 @@ class Dirichlet(DistributionNonNegative):
 
     def __init__(self,
                  alpha: list,
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.alpha = alpha
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.dirichlet(alpha=self.alpha,
@@ -186,7 +194,7 @@ class Exponential(DistributionNonNegative):
     """
     The Exponential distribution is non-negative and continuous.
 
-    The implementation is from `numpy.random.mtrand.RandomState.exponential <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.exponential.html>`_.
+    The implementation is from `numpy.random.Generator.exponential <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.exponential.html>`_.
 
     Distribution function:
 
@@ -196,30 +204,38 @@ class Exponential(DistributionNonNegative):
 
     def __init__(self,
                  beta: Union[int, ndarray, Iterable[int]] = 1.0,
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.beta = beta
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.exponential(scale=self.beta,
                                    size=size)
 
+    def _fill_batch(self, out: ndarray):
+        if not self._native_out(out) or numpy.ndim(self.beta) != 0:
+            return super()._fill_batch(out)
+        self.rs.standard_exponential(out=out)
+        out *= self.beta
+
 
 class F(DistributionNonNegative):
     """
     The Fisher distribution is non-negative and continuous.
 
-    The implementation is from `numpy.random.mtrand.RandomState.f <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.f.html>`_.
+    The implementation is from `numpy.random.Generator.f <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.f.html>`_.
     """
     continuous = True
 
     def __init__(self,
                  dfnum: Union[int, ndarray, Iterable[int]],
                  dfden: Union[int, ndarray, Iterable[int]],
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.dfnum = dfnum
         self.dfden = dfden
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.f(dfnum=self.dfnum,
@@ -231,7 +247,7 @@ class FNonCentral(DistributionNonNegative):
     """
     The non-central Fisher distribution is non-negative and continuous.
 
-    The implementation is from `numpy.random.mtrand.RandomState.noncentral_f <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.noncentral_f.html>`_.
+    The implementation is from `numpy.random.Generator.noncentral_f <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.noncentral_f.html>`_.
     """
     continuous = True
 
@@ -239,11 +255,12 @@ class FNonCentral(DistributionNonNegative):
                  dfnum: Union[int, ndarray, Iterable[int]],
                  dfden: Union[int, ndarray, Iterable[int]],
                  nonc: Union[float, ndarray, Iterable[float]],
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.dfnum = dfnum
         self.dfden = dfden
         self.nonc = nonc
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.noncentral_f(dfnum=self.dfnum,
@@ -256,7 +273,7 @@ class Gamma(DistributionNonNegative):
     """
     The Gamma distribution is non-negative and continuous.
 
-    The implementation is from `numpy.random.mtrand.RandomState.gamma <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.gamma.html>`_.
+    The implementation is from `numpy.random.Generator.gamma <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.gamma.html>`_.
 
     Distribution function:
 
@@ -267,22 +284,29 @@ class Gamma(DistributionNonNegative):
     def __init__(self,
                  k: Union[float, ndarray, Iterable[float]],
                  theta: Union[float, ndarray, Iterable[float]] = 1.0,
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.k = k
         self.theta = theta
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.gamma(shape=self.k,
                              scale=self.theta,
                              size=size)
 
+    def _fill_batch(self, out: ndarray):
+        if not self._native_out(out) or numpy.ndim(self.k) != 0 or numpy.ndim(self.theta) != 0:
+            return super()._fill_batch(out)
+        self.rs.standard_gamma(shape=self.k, out=out)
+        out *= self.theta
+
 
 class Geometric(DistributionNonNegative):
     """
     The Geometric distribution is non-negative and discrete.
 
-    The implementation is from `numpy.random.mtrand.RandomState.geometric <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.geometric.html>`_.
+    The implementation is from `numpy.random.Generator.geometric <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.geometric.html>`_.
 
     Distribution function:
 
@@ -293,9 +317,10 @@ class Geometric(DistributionNonNegative):
 
     def __init__(self,
                  p: Union[float, ndarray, Iterable[float]],
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.p = p
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.geometric(p=self.p,
@@ -306,7 +331,7 @@ class Gumbel(DistributionUnbounded):
     """
     The Gumbel distribution is unbounded and continuous.
 
-    The implementation is from `numpy.random.mtrand.RandomState.gumbel <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.gumbel.html>`_.
+    The implementation is from `numpy.random.Generator.gumbel <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.gumbel.html>`_.
 
     Distribution function:
 
@@ -317,10 +342,11 @@ class Gumbel(DistributionUnbounded):
     def __init__(self,
                  mu: Union[float, ndarray, Iterable[float]] = 0.0,
                  beta: Union[float, ndarray, Iterable[float]] = 1.0,
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.mu = mu
         self.beta = beta
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.gumbel(loc=self.mu,
@@ -332,7 +358,7 @@ class Hypergeometric(DistributionNonNegative):
     """
     The Hypergeometric distribution is non-negative and discrete.
 
-    The implementation is from `numpy.random.mtrand.RandomState.hypergeometric <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.hypergeometric.html>`_.
+    The implementation is from `numpy.random.Generator.hypergeometric <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.hypergeometric.html>`_.
 
     Distribution function:
 
@@ -344,11 +370,12 @@ class Hypergeometric(DistributionNonNegative):
                  n: int,
                  m: Union[int, ndarray, Iterable[int]],
                  N: Union[int, ndarray, Iterable[int]],
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.n = n
         self.m = m
         self.N = N
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.hypergeometric(ngood=self.n,
@@ -361,7 +388,7 @@ class Laplace(DistributionUnbounded):
     """
     The Laplace distribution is unbounded and continuous.
 
-    The implementation is from `numpy.random.mtrand.RandomState.laplace <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.laplace.html>`_.
+    The implementation is from `numpy.random.Generator.laplace <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.laplace.html>`_.
 
     Distribution function:
 
@@ -372,10 +399,11 @@ class Laplace(DistributionUnbounded):
     def __init__(self,
                  mu: Union[float, ndarray, Iterable[float]],
                  beta: Union[float, ndarray, Iterable[float]],
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.mu = mu
         self.beta = beta
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.laplace(loc=self.mu,
@@ -387,7 +415,7 @@ class Logistic(DistributionUnbounded):
     """
     The Logistic distribution is unbounded and continuous.
 
-    The implementation is from `numpy.random.mtrand.RandomState.logistic <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.logistic.html>`_.
+    The implementation is from `numpy.random.Generator.logistic <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.logistic.html>`_.
 
     Distribution function:
 
@@ -398,10 +426,11 @@ class Logistic(DistributionUnbounded):
     def __init__(self,
                  mu: Union[float, ndarray, Iterable[float]],
                  beta: Union[float, ndarray, Iterable[float]],
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.mu = mu
         self.beta = beta
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.logistic(loc=self.mu,
@@ -413,7 +442,7 @@ class Lognormal(DistributionNonNegative):
     """
     The Lognormal distribution is non-negative and continuous.
 
-    The implementation is from `numpy.random.mtrand.RandomState.lognormal <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.lognormal.html>`_.
+    The implementation is from `numpy.random.Generator.lognormal <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.lognormal.html>`_.
 
     Distribution function:
 
@@ -424,10 +453,11 @@ class Lognormal(DistributionNonNegative):
     def __init__(self,
                  mu: Union[float, ndarray, Iterable[float]],
                  sigma: Union[float, ndarray, Iterable[float]],
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.mu = mu
         self.sigma = sigma
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.lognormal(mean=self.mu,
@@ -439,7 +469,7 @@ class Lomax(DistributionNonNegative):
     """
     The Pareto II or Lomax distribution is non-negative and continuous.
 
-    The implementation is from `numpy.random.mtrand.RandomState.pareto <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.pareto.html>`_.
+    The implementation is from `numpy.random.Generator.pareto <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.pareto.html>`_.
 
     Distribution function:
 
@@ -450,9 +480,10 @@ class Lomax(DistributionNonNegative):
 
     def __init__(self,
                  a: Union[float, ndarray, Iterable[float]],
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.a = a
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.pareto(a=self.a,
@@ -463,17 +494,18 @@ class Multinomial(DistributionNonNegative):
     """
     The Multinomial distribution is non-negative and discrete.
 
-    The implementation is from `numpy.random.mtrand.RandomState.multinomial <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.multinomial.html>`_.
+    The implementation is from `numpy.random.Generator.multinomial <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.multinomial.html>`_.
     """
     continuous = False
 
     def __init__(self,
                  n: int,
                  pvals: Union[float, ndarray, Iterable[float]],
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.n = n
         self.pvals = pvals
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.multinomial(n=self.n,
@@ -485,7 +517,7 @@ class Normal(DistributionUnbounded):
     """
     The Normal/Gaussian distribution if unbounded and continuous.
 
-    The implementation is from `numpy.random.mtrand.RandomState.normal <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.normal.html>`_.
+    The implementation is from `numpy.random.Generator.normal <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.normal.html>`_.
 
     Distribution function:
 
@@ -496,30 +528,39 @@ class Normal(DistributionUnbounded):
     def __init__(self,
                  mean: Union[float, ndarray, Iterable[float]] = 0.0,
                  std: Union[float, ndarray, Iterable[float]] = 1.0,
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.mean = mean
         self.std = std
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.normal(loc=self.mean, scale=self.std, size=size)
 
+    def _fill_batch(self, out: ndarray):
+        if not self._native_out(out) or numpy.ndim(self.mean) != 0 or numpy.ndim(self.std) != 0:
+            return super()._fill_batch(out)
+        self.rs.standard_normal(out=out)
+        out *= self.std
+        out += self.mean
+
 
 class NormalMultivariate(DistributionUnbounded):
     """
     The multivariate Normal distribution is unbounded and continuous.
 
-    The implementation is from `numpy.random.mtrand.RandomState.multivariate_normal <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.multivariate_normal.html>`_.
+    The implementation is from `numpy.random.Generator.multivariate_normal <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.multivariate_normal.html>`_.
     """
     continuous = False
 
     def __init__(self,
                  mu: Union[float, ndarray, Iterable[float]],
                  cov: Union[list, ndarray],
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.mu = mu
         self.cov = cov
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.multivariate_normal(mean=self.mu,
@@ -531,7 +572,7 @@ class Poisson(DistributionNonNegative):
     """
     The Poisson distribution is non-negative and discrete.
 
-    The implementation is from `numpy.random.mtrand.RandomState.poisson <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.poisson.html>`_.
+    The implementation is from `numpy.random.Generator.poisson <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.poisson.html>`_.
 
     Distribution function:
 
@@ -541,9 +582,10 @@ class Poisson(DistributionNonNegative):
 
     def __init__(self,
                  lam: Union[float, ndarray, Iterable[float]] = 1.0,
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.lam = lam
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.poisson(lam=self.lam,
@@ -554,7 +596,7 @@ class Power(DistributionBounded):
     """
     The Power distribution is bounded and continuous.
 
-    The implementation is from `numpy.random.mtrand.RandomState.power <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.power.html>`_.
+    The implementation is from `numpy.random.Generator.power <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.power.html>`_.
 
     Distribution function:
 
@@ -566,9 +608,10 @@ class Power(DistributionBounded):
 
     def __init__(self,
                  a: Union[float, ndarray, Iterable[float]],
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.a = a
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.power(a=self.a,
@@ -579,46 +622,56 @@ class Randint(DistributionBounded):
     """
     The Randint distribution is bounded and discrete.
 
-    The implementation is from `numpy.random.mtrand.RandomState.randint <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.randint.html>`_.
+    The implementation is from `numpy.random.Generator.integers <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.integers.html>`_.
     """
     continuous = False
 
     def __init__(self,
                  lb: int,
                  ub: int,
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.lb = lb
         self.ub = ub
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
-        return self.rs.randint(low=self.lb,
-                               high=self.ub,
-                               size=size)
+        if self.legacy:
+            return self.rs.randint(low=self.lb,
+                                   high=self.ub,
+                                   size=size)
+        return self.rs.integers(low=self.lb,
+                                high=self.ub,
+                                size=size)
 
 
 class RandomSample(DistributionBounded):
     """
     The RandomSample distribution is bounded and continuous.
 
-    The implementation is from `numpy.random.mtrand.RandomState.random_sample <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.random_sample.html>`_.
+    The implementation is from `numpy.random.Generator.random <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.random.html>`_.
     """
     continuous = True
     lb = 0
     ub = 1
 
-    def __init__(self, seed=None):
-        self.rs = RandomState(seed=seed)
+    def __init__(self, seed=None, **kwargs):
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
-        return self.rs.random_sample(size=size)
+        return self.rs.random(size=size)
+
+    def _fill_batch(self, out: ndarray):
+        if not self._native_out(out):
+            return super()._fill_batch(out)
+        self.rs.random(out=out)
 
 
 class Rayleigh(DistributionNonNegative):
     """
     The Rayleigh distribution is non-negative and continuous.
 
-    The implementation is from `numpy.random.mtrand.RandomState.rayleigh <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.rayleigh.html>`_.
+    The implementation is from `numpy.random.Generator.rayleigh <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.rayleigh.html>`_.
 
     Distribution function:
 
@@ -628,9 +681,10 @@ class Rayleigh(DistributionNonNegative):
 
     def __init__(self,
                  sigma: Union[float, ndarray, Iterable[float]],
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.sigma = sigma
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.rayleigh(scale=self.sigma,
@@ -641,7 +695,7 @@ class Triangular(DistributionBounded):
     """
     The Triangular distribution is bounded and continuous.
 
-    The implementation is from `numpy.random.mtrand.RandomState.triangular <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.triangular.html>`_.
+    The implementation is from `numpy.random.Generator.triangular <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.triangular.html>`_.
 
     Distribution function:
 
@@ -653,13 +707,14 @@ class Triangular(DistributionBounded):
                  left: Union[float, ndarray, Iterable[float]],
                  mode: Union[float, ndarray, Iterable[float]],
                  right: Union[float, ndarray, Iterable[float]],
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.left = left
         self.mode = mode
         self.right = right
         self.lb = left
         self.ub = right
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.triangular(left=self.left,
@@ -672,7 +727,7 @@ class Uniform(DistributionBounded):
     """
     The Uniform distribution is bounded and discrete.
 
-    The implementation is from `numpy.random.mtrand.RandomState.uniform <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.uniform.html>`_.
+    The implementation is from `numpy.random.Generator.uniform <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.uniform.html>`_.
 
     Distribution function:
 
@@ -683,38 +738,47 @@ class Uniform(DistributionBounded):
     def __init__(self,
                  lb: Union[float, ndarray, Iterable[float]],
                  ub: Union[float, ndarray, Iterable[float]],
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.lb = lb
         self.ub = ub
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.uniform(low=self.lb,
                                high=self.ub,
                                size=size)
 
+    def _fill_batch(self, out: ndarray):
+        if not self._native_out(out) or numpy.ndim(self.lb) != 0 or numpy.ndim(self.ub) != 0:
+            return super()._fill_batch(out)
+        self.rs.random(out=out)
+        out *= self.ub - self.lb
+        out += self.lb
+
 
 class Vonmises(DistributionBounded):
     """
     The Vonmises distribution is bounded and continuous.
 
-    The implementation is from `numpy.random.mtrand.RandomState.vonmises <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.vonmises.html>`_.
+    The implementation is from `numpy.random.Generator.vonmises <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.vonmises.html>`_.
 
     Distribution function:
 
     .. math:: p(x) = \\frac{e^{\\kappa cos(x-\\mu)}}{2\\pi I_0(\\kappa)}
     """
     continuous = True
-    lb = -numpy.math.pi
-    ub = +numpy.math.pi
+    lb = -math.pi
+    ub = +math.pi
 
     def __init__(self,
                  mu: Union[float, ndarray, Iterable[float]],
                  kappa: Union[float, ndarray, Iterable[float]],
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.mu = mu
         self.kappa = kappa
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.vonmises(mu=self.mu,
@@ -726,7 +790,7 @@ class Wald(DistributionNonNegative):
     """
     The Wald distribution is non-negative and continuous.
 
-    The implementation is from `numpy.random.mtrand.RandomState.wald <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.wald.html>`_.
+    The implementation is from `numpy.random.Generator.wald <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.wald.html>`_.
 
     Distribution function:
 
@@ -737,10 +801,11 @@ class Wald(DistributionNonNegative):
     def __init__(self,
                  mu: Union[float, ndarray, Iterable[float]],
                  lam: Union[float, ndarray, Iterable[float]],
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.mu = mu
         self.lam = lam
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.wald(mean=self.mu,
@@ -752,7 +817,7 @@ class Weibull(DistributionNonNegative):
     """
     The Weibull distribution is non-negative and continuous.
 
-    The implementation is from `numpy.random.mtrand.RandomState.weibull <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.weibull.html>`_.
+    The implementation is from `numpy.random.Generator.weibull <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.weibull.html>`_.
 
     Distribution function:
 
@@ -762,9 +827,10 @@ class Weibull(DistributionNonNegative):
 
     def __init__(self,
                  a: Union[float, ndarray, Iterable[float]],
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.a = a
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.weibull(a=self.a,
@@ -775,7 +841,7 @@ class Zipf(DistributionNonNegative):
     """
     The Zipf distribution is non-negative and discrete.
 
-    The implementation is from `numpy.random.mtrand.RandomState.zipf <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.zipf.html>`_.
+    The implementation is from `numpy.random.Generator.zipf <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.zipf.html>`_.
 
     Distribution function:
 
@@ -786,9 +852,10 @@ class Zipf(DistributionNonNegative):
 
     def __init__(self,
                  a: Union[float, ndarray, Iterable[float]],
-                 seed=None):
+                 seed=None,
+                 **kwargs):
         self.a = a
-        self.rs = RandomState(seed=seed)
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.zipf(a=self.a,
@@ -799,18 +866,47 @@ class Choice(DistributionBounded):
     """
     The Choice distribution is bounded and discrete.
 
-    The implementation is from `numpy.random.mtrand.RandomState.choice <https://docs.scipy.org/doc/numpy-1.5.x/reference/generated/numpy.random.mtrand.RandomState.choice.html>`_.
+    The implementation is from `numpy.random.Generator.choice <https://numpy.org/doc/stable/reference/random/generated/numpy.random.Generator.choice.html>`_.
+
+    It returns the index of the chosen probability, or the matching element of categories when given.
+    With categorical, batches are returned as CategoricalArray: the indexes, with categories
+    (or the indexes themselves) as the values they stand for.
     """
     continuous = False
 
     def __init__(self,
                  probabilities: numpy.array,
-                 seed=None):
+                 seed=None,
+                 categories: Iterable=None,
+                 categorical: bool=False,
+                 **kwargs):
         self.probabilities = probabilities
         self.a = numpy.arange(len(probabilities))
         self.lb = 0
         self.ub = len(probabilities) - 1
-        self.rs = RandomState(seed=seed)
+        self.categories = None if categories is None else numpy.asarray(categories)
+        self.categorical = categorical
+        super().__init__(seed=seed, **kwargs)
 
     def _get(self, size=None):
         return self.rs.choice(a=self.a, p=self.probabilities, size=size)
+
+    def get_single(self):
+        if self.categories is None:
+            return super().get_single()
+        return self.categories[super().get_single()]
+
+    def get_batch(self, batch_size: int, out: ndarray=None):
+        if self.categorical or self.categories is not None:
+            return self._decode(super().get_batch(batch_size), out)
+        return super().get_batch(batch_size, out=out)
+
+    def get_range(self, start: int, stop: int, out: ndarray=None):
+        if self.categorical or self.categories is not None:
+            return self._decode(super().get_range(start, stop), out)
+        return super().get_range(start, stop, out=out)
+
+    def _decode(self, codes: ndarray, out: ndarray=None):
+        if self.categorical:
+            return _categorical(codes, self.a if self.categories is None else self.categories, out)
+        return _into(self.categories[codes], out)
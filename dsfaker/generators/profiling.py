@@ -0,0 +1,132 @@
+import time
+
+import numpy
+
+from .base import Generator
+
+__all__ = ['Profiler']
+
+_METHODS = ('get_single', 'get_batch')
+
+
+class Profiler:
+    def __init__(self, generator: Generator):
+        """
+        Records, for every node of a Generator tree, the calls, wall time, rows produced and bytes allocated
+        by get_single and get_batch.
+
+        The methods are only wrapped (on the instances) between attach and detach, so a tree that is not
+        being profiled runs its own methods without any overhead. It can also be used as a context manager:
+
+        >>> with Profiler(generator) as profiler:
+        >>>     generator.get_batch(1000)
+        >>> profiler.print_report()
+
+        :param generator: the root of the Generator tree to profile
+        """
+        self.generator = generator
+        self.stats = {}
+        self._nodes = {}
+        self._saved = {}
+        self._stack = []
+
+    def _walk(self, generator, depth=0, seen=None):
+        seen = set() if seen is None else seen
+        yield generator, depth, id(generator) in seen
+        if id(generator) in seen:
+            return
+        seen.add(id(generator))
+        for child in generator._children():
+            yield from self._walk(child, depth + 1, seen)
+
+    def attach(self):
+        """
+        Wraps get_single and get_batch of every node of the tree.
+        """
+        if self._saved:
+            return self
+        for node, _, repeated in self._walk(self.generator):
+            if repeated:
+                continue
+            self._nodes[id(node)] = node
+            self._saved[id(node)] = {m: node.__dict__[m] for m in _METHODS if m in node.__dict__}
+            for method in _METHODS:
+                setattr(node, method, self._wrap(node, method, getattr(node, method)))
+        return self
+
+    def detach(self):
+        """
+        Restores the original methods of every node of the tree.
+        """
+        for key, saved in self._saved.items():
+            node = self._nodes[key]
+            for method in _METHODS:
+                if method in saved:
+                    setattr(node, method, saved[method])
+                else:
+                    node.__dict__.pop(method, None)
+        self._saved = {}
+        return self
+
+    def reset(self):
+        self.stats = {}
+
+    def _wrap(self, node, method, function):
+        stack = self._stack
+        key = id(node)
+
+        def wrapper(*args, **kwargs):
+            frame = [0.0]
+            stack.append(frame)
+            start = time.perf_counter()
+            try:
+                res = function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                stack.pop()
+                if stack:
+                    stack[-1][0] += elapsed
+            s = self.stats.setdefault(key, {}).setdefault(method, {'calls': 0, 'time': 0.0, 'self_time': 0.0,
+                                                                   'rows': 0, 'bytes': 0})
+            s['calls'] += 1
+            s['time'] += elapsed
+            s['self_time'] += elapsed - frame[0]
+            if method == 'get_single':
+                s['rows'] += 1
+            else:
+                s['rows'] += len(res) if hasattr(res, '__len__') else 0
+                out = kwargs.get('out', args[1] if len(args) > 1 else None)
+                if isinstance(res, numpy.ndarray) and res is not out:
+                    s['bytes'] += res.nbytes
+            return res
+
+        return wrapper
+
+    def __enter__(self):
+        return self.attach()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.detach()
+
+    def report(self) -> str:
+        """
+        Returns the statistics as a tree, one line per node and method (times in milliseconds,
+        self time excluding the time spent in the nodes called).
+        """
+        lines = ['{:<40} {:<10} {:>8} {:>12} {:>12} {:>12} {:>14}'.format(
+            'node', 'method', 'calls', 'total ms', 'self ms', 'rows', 'bytes')]
+        for node, depth, repeated in self._walk(self.generator):
+            name = '  ' * depth + type(node).__name__ + (' (shared)' if repeated else '')
+            stats = self.stats.get(id(node), {})
+            if repeated or not stats:
+                lines.append(name)
+                continue
+            for i, method in enumerate(m for m in _METHODS if m in stats):
+                s = stats[method]
+                lines.append('{:<40} {:<10} {:>8} {:>12.3f} {:>12.3f} {:>12} {:>14}'.format(
+                    name if i == 0 else '', method, s['calls'], s['time'] * 1e3, s['self_time'] * 1e3,
+                    s['rows'], s['bytes']))
+        return '\n'.join(lines)
+
+    def print_report(self):
+        print(self.report())
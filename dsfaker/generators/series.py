@@ -1,4 +1,3 @@
-import math
 import numpy
 
 from . import Generator
@@ -9,42 +8,74 @@ class Serie(Generator):
 
 
 class RepeatPattern(Serie):
-    def __init__(self, pattern: numpy.array):
+    def __init__(self, pattern: numpy.array, views: bool=False):
+        """
+        Repeats a pattern indefinitely.
+
+        :param pattern: the values to repeat
+        :param views: return batches as read-only views, either on the pattern or on a buffer holding the pattern
+            repeated, instead of new arrays; the buffer is only ever replaced, so a view is never overwritten
+        """
         self.pattern = numpy.asarray(pattern)
         self.l = len(pattern)
         self.index = 0
+        self.views = views
+        self._repeated = None
 
-    def _get(self, size):
-        if size == 1:
-            if self.index == self.l:
-                self.index = 1
-                return self.pattern[0]
-            else:
-                self.index += 1
-                return self.pattern[self.index - 1]
+    def _view(self, index, size):
+        """
+        Returns a read-only view of size elements of the pattern repeated, starting at index.
+        """
+        if index + size <= self.l:
+            view = self.pattern[index:index + size].view()
         else:
-            if self.index == self.l:
-                self.index = 0
-
-            remaining = self.l - self.index
-
-            if size > remaining:
-                nb_tiles = math.ceil((size - remaining) / self.l)
-            else:
-                nb_tiles = 0
-
-            if nb_tiles > 0:
-                tiles = numpy.tile(self.pattern, nb_tiles)
-                split_index = size - (nb_tiles * self.l) - remaining
-                old_idx = self.index
-                self.index = self.l + split_index
-                return numpy.concatenate((self.pattern[old_idx:], tiles[:split_index] if split_index != 0 else tiles))
-            else:
-                self.index += size
-                return self.pattern[(self.index-size):self.index]
+            if self._repeated is None or len(self._repeated) < index + size:
+                # Grows geometrically, so that growing batches do not rebuild the buffer at every call
+                length = max(index + size, 2 * self.l, 0 if self._repeated is None else 2 * len(self._repeated))
+                self._repeated = self._fill(numpy.empty((length,) + self.pattern.shape[1:], dtype=self.pattern.dtype), 0)
+                self._repeated.flags.writeable = False
+            view = self._repeated[index:index + size]
+        view.flags.writeable = False
+        return view
+
+    def _fill(self, out, index):
+        """
+        Fills out with the pattern starting at index, without any temporary array:
+        the first period is copied from the pattern, then the filled part is copied onto the rest, doubling each time.
+        """
+        size = len(out)
+        head = min(size, self.l - index)
+        out[:head] = self.pattern[index:index + head]
+        filled = head
+        if filled < size:
+            tail = min(size - filled, index)
+            out[filled:filled + tail] = self.pattern[:tail]
+            filled += tail
+        while filled < size:
+            length = min(filled, size - filled)
+            out[filled:filled + length] = out[:length]
+            filled += length
+        return out
 
     def get_single(self):
-        return self._get(1)
+        index = self.index
+        self.index = (index + 1) % self.l
+        return self.pattern[index]
+
+    def get_batch(self, batch_size: int, out: numpy.ndarray=None):
+        index = self.index
+        self.index = (index + batch_size) % self.l
+        return self._get(index, batch_size, out)
+
+    def seek(self, n: int):
+        self.index = n % self.l
+
+    def get_range(self, start: int, stop: int, out: numpy.ndarray=None):
+        return self._get(start % self.l, stop - start, out)
 
-    def get_batch(self, batch_size: int):
-        return self._get(batch_size)
+    def _get(self, index, size, out=None):
+        if out is not None:
+            return self._fill(out, index)
+        if self.views:
+            return self._view(index, size)
+        return self._fill(numpy.empty((size,) + self.pattern.shape[1:], dtype=self.pattern.dtype), index)
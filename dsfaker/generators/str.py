@@ -1,11 +1,272 @@
 from random import Random
+import string
+
+import numpy
+from numpy.random import SeedSequence
 from rstr import Rstr
+
+try:
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
 from . import Generator
+from .base import _into
+from .categorical import _categorical
+
+# Same alphabets and repeat limit as rstr, so that batches and single values come from the same strings
+_STAR_PLUS_LIMIT = 100
+_CATEGORIES = {
+    'category_digit': string.digits,
+    'category_not_digit': string.ascii_letters + string.punctuation,
+    'category_space': string.whitespace,
+    'category_not_space': string.printable.strip(),
+    'category_word': string.ascii_letters + string.digits + '_',
+    'category_not_word': ''.join(sorted(set(string.printable).difference(string.ascii_letters + string.digits + '_'))),
+}
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def _chars(chars) -> tuple:
+    return 'chars', numpy.array(sorted(set(ord(c) for c in chars)), dtype=numpy.uint32)
+
+
+def _printable_except(chars) -> tuple:
+    return _chars(set(string.printable).difference(chars))
+
+
+def _compile(parsed) -> tuple:
+    """
+    Compiles a parsed regex into a generation plan made of ('chars', codepoints), ('seq', nodes),
+    ('repeat', min, max, node) and ('branch', nodes) nodes.
+    Raises _Unsupported for the constructs that depend on what was already generated (group references).
+    """
+    nodes = []
+    for opcode, value in parsed:
+        opcode = opcode.name.lower()
+        if opcode == 'literal':
+            nodes.append(('chars', numpy.array([value], dtype=numpy.uint32)))
+        elif opcode == 'not_literal':
+            nodes.append(_printable_except(chr(value)))
+        elif opcode == 'any':
+            nodes.append(_printable_except('\n'))
+        elif opcode == 'category':
+            nodes.append(_chars(_CATEGORIES[value.name.lower()]))
+        elif opcode == 'in':
+            nodes.append(_compile_in(value))
+        elif opcode == 'branch':
+            nodes.append(('branch', [_compile(p) for p in value[1]]))
+        elif opcode in ('subpattern', 'atomic_group'):
+            nodes.append(_compile(value[-1]))
+        elif opcode == 'assert':
+            nodes.append(_compile(value[1]))
+        elif opcode in ('at', 'assert_not'):
+            continue
+        elif opcode in ('max_repeat', 'min_repeat', 'possessive_repeat'):
+            lo, hi, p = value
+            nodes.append(('repeat', lo, min(hi, _STAR_PLUS_LIMIT), _compile(p)))
+        else:
+            raise _Unsupported(opcode)
+    return 'seq', nodes
+
+
+def _compile_in(items) -> tuple:
+    chars = []
+    negate = False
+    for opcode, value in items:
+        opcode = opcode.name.lower()
+        if opcode == 'negate':
+            negate = True
+        elif opcode == 'literal':
+            chars.append(chr(value))
+        elif opcode == 'range':
+            chars.extend(chr(i) for i in range(value[0], value[1] + 1))
+        elif opcode == 'category':
+            chars.extend(_CATEGORIES[value.name.lower()])
+        else:
+            raise _Unsupported(opcode)
+    return _printable_except(chars) if negate else _chars(chars)
+
+
+def _concat(parts, n) -> tuple:
+    """
+    Concatenates, row by row, (codepoints, lengths) parts of n rows.
+    The codepoints after the length of a row are left undefined.
+    """
+    width = sum(codes.shape[1] for codes, _ in parts)
+    res = numpy.empty((n, width), dtype=numpy.uint32)
+    offsets = numpy.zeros(n, dtype=numpy.int64)
+    fixed = 0  # The common offset of all the rows, while they all have the same length
+    for codes, lengths in parts:
+        w = codes.shape[1]
+        if fixed is not None:
+            res[:, fixed:fixed + w] = codes
+            if (lengths == w).all():
+                fixed += w
+                continue
+            offsets[:] = fixed
+            fixed = None
+        else:
+            rows, cols = numpy.nonzero(numpy.arange(w) < lengths[:, None])
+            res[rows, offsets[rows] + cols] = codes[rows, cols]
+        offsets += lengths
+    if fixed is not None:
+        offsets[:] = fixed
+    return res, offsets
+
+
+def _generate(node, n, rs) -> tuple:
+    """
+    Returns the codepoints (n rows, padded to the longest one) and the lengths of n strings generated from a plan.
+    """
+    kind = node[0]
+    if kind == 'chars':
+        chars = node[1]
+        codes = numpy.full((n, 1), chars[0], dtype=numpy.uint32) if len(chars) == 1 \
+            else chars[rs.integers(0, len(chars), size=n)][:, None]
+        return codes, numpy.ones(n, dtype=numpy.int64)
+
+    if kind == 'seq':
+        return _concat([_generate(child, n, rs) for child in node[1]], n)
+
+    if kind == 'repeat':
+        _, lo, hi, child = node
+        if hi == 0:
+            return numpy.empty((n, 0), dtype=numpy.uint32), numpy.zeros(n, dtype=numpy.int64)
+        times = rs.integers(lo, hi + 1, size=n)
+        codes, lengths = _generate(child, n * hi, rs)
+        codes = codes.reshape(n, hi, codes.shape[1])
+        lengths = lengths.reshape(n, hi)
+        if (lengths == codes.shape[2]).all():
+            # Fixed width repetitions: the kept ones already are a prefix of the row
+            return codes.reshape(n, hi * codes.shape[2]), times * codes.shape[2]
+        lengths[numpy.arange(hi) >= times[:, None]] = 0
+        return _concat([(codes[:, i], lengths[:, i]) for i in range(hi)], n)
+
+    # branch
+    branches = node[1]
+    choices = rs.integers(0, len(branches), size=n)
+    generated = [(rows, _generate(branch, len(rows), rs))
+                 for rows, branch in ((numpy.flatnonzero(choices == i), branch) for i, branch in enumerate(branches))]
+    res = numpy.empty((n, max(codes.shape[1] for _, (codes, _) in generated)), dtype=numpy.uint32)
+    res_lengths = numpy.empty(n, dtype=numpy.int64)
+    for rows, (codes, lengths) in generated:
+        res[rows, :codes.shape[1]] = codes
+        res_lengths[rows] = lengths
+    return res, res_lengths
+
+
+def _enumerate(node, limit) -> dict:
+    """
+    Returns the strings a plan generates, with the probability of generating each of them.
+    Raises ValueError when there are more than limit of them.
+    """
+    kind = node[0]
+    if kind == 'chars':
+        return {chr(c): 1 / len(node[1]) for c in node[1]}
+
+    if kind == 'branch':
+        parts = [(_enumerate(child, limit), 1 / len(node[1])) for child in node[1]]
+    elif kind == 'repeat':
+        _, lo, hi, child = node
+        child = _enumerate(child, limit)
+        parts = []
+        power = {'': 1.0}
+        for times in range(hi + 1):
+            if times >= lo:
+                parts.append((power, 1 / (hi - lo + 1)))
+            if times < hi:
+                power = _product(power, child, limit)
+    else:
+        res = {'': 1.0}
+        for child in node[1]:
+            res = _product(res, _enumerate(child, limit), limit)
+        return res
+
+    res = {}
+    for strings, p in parts:
+        for k, v in strings.items():
+            res[k] = res.get(k, 0.0) + v * p
+    if len(res) > limit:
+        raise ValueError("the regex matches more than {} strings".format(limit))
+    return res
+
+
+def _product(left, right, limit) -> dict:
+    if len(left) * len(right) > limit:
+        raise ValueError("the regex matches more than {} strings".format(limit))
+    res = {}
+    for k1, v1 in left.items():
+        for k2, v2 in right.items():
+            res[k1 + k2] = res.get(k1 + k2, 0.0) + v1 * v2
+    return res
+
 
 class Regex(Generator):
-    def __init__(self, regex, seed=None):
-        self.gen = Rstr(Random(seed))
+    def __init__(self, regex, seed=None, categorical: bool=False, max_categories: int=65536):
+        """
+        Generates strings matching a regex.
+
+        The regex is compiled once into a generation plan, from which batches are generated with numpy, as a
+        fixed width unicode array. Regexes using group references are generated one string at a time.
+
+        :param regex: the regex (a str or a compiled pattern)
+        :param seed: the seed of the strings
+        :param categorical: return batches as CategoricalArray: the regex must match at most max_categories strings,
+            which are enumerated once and drawn with the probabilities they are generated with
+        :param max_categories: the maximum number of strings of a categorical regex
+        """
         self.regex = regex
+        try:
+            self.plan = _compile(sre_parse.parse(getattr(regex, 'pattern', regex)))
+        except _Unsupported:
+            self.plan = None
+
+        self.categorical = categorical
+        if categorical:
+            if self.plan is None:
+                raise ValueError("a regex with group references cannot be categorical")
+            strings = _enumerate(self.plan, max_categories)
+            self.categories = numpy.array(sorted(strings))
+            self.probabilities = numpy.array([strings[k] for k in self.categories])
+            self.probabilities /= self.probabilities.sum()
+        self.reseed(seed)
 
     def get_single(self):
         return self.gen.xeger(self.regex)
+
+    def get_batch(self, batch_size: int, out: numpy.ndarray=None) -> numpy.array:
+        if self.categorical:
+            codes = self.rs.choice(len(self.categories), p=self.probabilities, size=batch_size)
+            return _categorical(codes, self.categories, out)
+
+        if self.plan is None:
+            return super().get_batch(batch_size, out=out)
+
+        codes, lengths = _generate(self.plan, batch_size, self.rs)
+        width = max(int(lengths.max(initial=0)), 1)
+        res = numpy.zeros((batch_size, width), dtype=numpy.uint32)
+        res[:, :min(width, codes.shape[1])] = codes[:, :width]
+        # Numpy strings end at their first NUL character
+        res[numpy.arange(width) >= lengths[:, None]] = 0
+        return _into(res.view('U%d' % width).ravel(), out)
+
+    def reseed(self, seed=None):
+        if isinstance(seed, SeedSequence):
+            seed = int(seed.generate_state(1, numpy.uint64)[0])
+        self.random = Random(seed)
+        self.gen = Rstr(self.random)
+        self.rs = numpy.random.default_rng(seed)
+
+    def __getstate__(self) -> dict:
+        # The Rstr holds local lambdas: it is rebuilt around the Random it draws from
+        state = self.__dict__.copy()
+        del state['gen']
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self.gen = Rstr(self.random)
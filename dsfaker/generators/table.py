@@ -0,0 +1,135 @@
+import numpy
+
+from .base import Generator
+from .categorical import CategoricalArray
+
+__all__ = ['Table']
+
+
+class Table(Generator):
+    def __init__(self, columns: dict, dtypes: dict=None, structured: bool=True):
+        """
+        Generates rows made of named columns, each one drawn from its own Generator.
+
+        Batches are allocated once, as a structured array or as one contiguous array per column, and every column
+        Generator writes its values directly into its column with `out`. The dtypes of the columns that are not given
+        are inferred from their first batch.
+
+        >>> Table({'id': Autoincrement(), ('time', 'value'): TimeSeries(time_gen, data_gen)},
+        >>>       dtypes={'id': numpy.uint32})
+
+        :param columns: the Generator of every column, by name; a tuple of names is given to a Generator returning a
+            tuple of batches, such as TimeSeries
+        :param dtypes: the dtype of some columns, by name; strings columns should be given one wide enough for all
+            their values, as a batch with a longer string raises ValueError
+        :param structured: return batches as a numpy structured array, or as a dict of arrays by column name
+        """
+        self.columns = dict(columns)
+        self.dtypes = {} if dtypes is None else {name: numpy.dtype(dtype) for name, dtype in dtypes.items()}
+        self.structured = structured
+        self.names = [name for key in self.columns for name in (key if isinstance(key, tuple) else (key,))]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("the column names must be unique")
+        self.shapes = {}
+        self._decoded = set()
+
+    def _drawn_apart(self, key) -> bool:
+        """
+        Whether the Generator of key is drawn without out: CategoricalArray columns are decoded into out, and string
+        columns are checked to fit in theirs.
+        """
+        names = key if isinstance(key, tuple) else (key,)
+        return key in self._decoded or any(self.dtypes[name].kind in 'SU' for name in names)
+
+    @property
+    def dtype(self) -> numpy.dtype:
+        """
+        The structured dtype of the rows, or None until the dtypes of all the columns are known.
+        """
+        if any(name not in self.dtypes for name in self.names):
+            return None
+        return numpy.dtype([(name, self.dtypes[name], self.shapes.get(name, ())) for name in self.names])
+
+    def _children(self) -> list:
+        return list(self.columns.values())
+
+    def get_single(self) -> dict:
+        row = {}
+        for key, generator in self.columns.items():
+            if isinstance(key, tuple):
+                row.update(zip(key, generator.get_single()))
+            else:
+                row[key] = generator.get_single()
+        return row
+
+    def get_batch(self, batch_size: int, out=None):
+        return self._fill(lambda generator, col: generator.get_batch(batch_size, out=col), batch_size, out)
+
+    def seek(self, n: int):
+        for generator in self.columns.values():
+            generator.seek(n)
+
+    def get_range(self, start: int, stop: int, out=None):
+        return self._fill(lambda generator, col: generator.get_range(start, stop, out=col), max(stop - start, 0), out)
+
+    def _fill(self, draw, size: int, out=None):
+        """
+        Fills every column of out (allocated when None) with draw(generator, column).
+        The columns whose dtype is unknown are drawn first, without out, to infer it. The columns returning
+        CategoricalArray are always drawn without out, and decoded into out, as are the string columns, which raise
+        ValueError rather than truncate a string longer than their width.
+        """
+        first = {}
+        for key, generator in self.columns.items():
+            names = key if isinstance(key, tuple) else (key,)
+            if any(name not in self.dtypes for name in names):
+                values = draw(generator, None)
+                values = values if isinstance(key, tuple) else (values,)
+                for name, v in zip(names, values):
+                    if isinstance(v, CategoricalArray):
+                        self._decoded.add(key)
+                    v = numpy.asarray(v)
+                    self.dtypes.setdefault(name, v.dtype)
+                    self.shapes[name] = v.shape[1:]
+                    first[name] = v
+
+        if out is None:
+            if self.structured:
+                out = numpy.empty(size, dtype=self.dtype)
+            else:
+                out = {name: numpy.empty((size,) + self.shapes.get(name, ()), dtype=self.dtypes[name])
+                       for name in self.names}
+
+        for key, generator in self.columns.items():
+            if isinstance(key, tuple):
+                cols = tuple(out[name] for name in key)
+                if any(name in first for name in key):
+                    values = tuple(first[name] for name in key)
+                else:
+                    values = draw(generator, None if self._drawn_apart(key) else cols)
+                for name, col, v in zip(key, cols, values):
+                    _assign(name, col, v)
+            else:
+                col = out[key]
+                values = first[key] if key in first else draw(generator, None if self._drawn_apart(key) else col)
+                _assign(key, col, values)
+        return out
+
+
+def _width(dtype: numpy.dtype) -> int:
+    return dtype.itemsize // 4 if dtype.kind == 'U' else dtype.itemsize
+
+
+def _assign(name, col: numpy.ndarray, values):
+    """
+    Copies values into the column col of a batch, unless they already are in it, checking that strings fit in it.
+    """
+    if values is col:
+        return
+    values = numpy.asarray(values)
+    if col.dtype.kind in 'SU' and values.dtype.kind in 'SU' and _width(values.dtype) > _width(col.dtype):
+        width, longest = _width(col.dtype), int(numpy.char.str_len(values).max(initial=0))
+        if longest > width:
+            raise ValueError("column {!r} holds strings of at most {} characters, not {}: give it a wider dtype"
+                             .format(name, width, longest))
+    col[...] = values
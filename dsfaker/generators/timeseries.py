@@ -9,5 +9,10 @@ class TimeSeries(Generator):
     def get_single(self):
         return self.time_gen.get_single(), self.data_gen.get_single()
 
-    def get_batch(self, batch_size: int):
-        return self.time_gen.get_batch(batch_size=batch_size), self.data_gen.get_batch(batch_size=batch_size)
+    def get_batch(self, batch_size: int, out: tuple=None):
+        if out is None:
+            # Without out, so that Generators whose get_batch does not take it keep working
+            return self.time_gen.get_batch(batch_size=batch_size), self.data_gen.get_batch(batch_size=batch_size)
+        time_out, data_out = out
+        return self.time_gen.get_batch(batch_size=batch_size, out=time_out), \
+               self.data_gen.get_batch(batch_size=batch_size, out=data_out)
@@ -1,10 +1,12 @@
-import datetime
+import asyncio
 import time
+from typing import Iterable
 
 import numpy
 
 from dsfaker.exceptions import NotCompatibleGeneratorException
 from . import BoundedGenerator, Generator
+from .base import _into
 
 
 class ConstantValueGenerator(Generator):
@@ -15,8 +17,17 @@ class ConstantValueGenerator(Generator):
     def get_single(self) -> float:
         return self.value
 
-    def get_batch(self, batch_size: int) -> numpy.array:
-        return numpy.ones(batch_size, dtype=self.dtype) * self.value
+    def get_batch(self, batch_size: int, out: numpy.ndarray=None) -> numpy.array:
+        if out is None:
+            return numpy.ones(batch_size, dtype=self.dtype) * self.value
+        out[...] = self.value
+        return out
+
+    def seek(self, n: int):
+        pass
+
+    def get_range(self, start: int, stop: int, out: numpy.ndarray=None) -> numpy.array:
+        return self.get_batch(stop - start, out=out)
 
 
 class BoundingOperator(BoundedGenerator):
@@ -28,8 +39,17 @@ class BoundingOperator(BoundedGenerator):
     def get_single(self):
         return numpy.clip(self.generator.get_single(), self.lb, self.ub)
 
-    def get_batch(self, batch_size: int):
-        return numpy.clip(self.generator.get_batch(batch_size=batch_size), self.lb, self.ub)
+    def get_batch(self, batch_size: int, out: numpy.ndarray=None):
+        if out is None:
+            return numpy.clip(self.generator.get_batch(batch_size=batch_size), self.lb, self.ub)
+        self.generator.get_batch(batch_size=batch_size, out=out)
+        return numpy.clip(out, self.lb, self.ub, out=out, casting='unsafe')
+
+    def seek(self, n: int):
+        self.generator.seek(n)
+
+    def get_range(self, start: int, stop: int, out: numpy.ndarray=None) -> numpy.array:
+        return numpy.clip(self.generator.get_range(start, stop), self.lb, self.ub, out=out)
 
 
 class ScalingOperator(BoundedGenerator):
@@ -51,8 +71,20 @@ class ScalingOperator(BoundedGenerator):
     def get_single(self):
         return self.generator.get_single() * self.coef - (self.gen_mid * self.coef) + self.mid
 
-    def get_batch(self, batch_size: int):
-        return numpy.asarray(self.generator.get_batch(batch_size=batch_size), dtype=self.dtype) * self.coef - (self.gen_mid * self.coef) + self.mid
+    def get_batch(self, batch_size: int, out: numpy.ndarray=None):
+        if out is None or out.dtype.kind != 'f' or (self.dtype is not None and numpy.dtype(self.dtype) != out.dtype):
+            return _into(numpy.asarray(self.generator.get_batch(batch_size=batch_size), dtype=self.dtype) * self.coef - (self.gen_mid * self.coef) + self.mid, out)
+        self.generator.get_batch(batch_size=batch_size, out=out)
+        out *= self.coef
+        out -= self.gen_mid * self.coef
+        out += self.mid
+        return out
+
+    def seek(self, n: int):
+        self.generator.seek(n)
+
+    def get_range(self, start: int, stop: int, out: numpy.ndarray=None) -> numpy.array:
+        return _into(numpy.asarray(self.generator.get_range(start, stop), dtype=self.dtype) * self.coef - (self.gen_mid * self.coef) + self.mid, out)
 
 
 class ApplyFunctionOperator(Generator):
@@ -63,8 +95,17 @@ class ApplyFunctionOperator(Generator):
     def get_single(self) -> float:
         return self.function(self.generator.get_single())
 
-    def get_batch(self, batch_size: int) -> numpy.array:
-        return self.function(self.generator.get_batch(batch_size=batch_size))
+    def get_batch(self, batch_size: int, out: numpy.ndarray=None) -> numpy.array:
+        if out is None or not isinstance(self.function, numpy.ufunc) or self.function.nin != 1:
+            return _into(self.function(self.generator.get_batch(batch_size=batch_size)), out)
+        self.generator.get_batch(batch_size=batch_size, out=out)
+        return self.function(out, out=out, casting='unsafe')
+
+    def seek(self, n: int):
+        self.generator.seek(n)
+
+    def get_range(self, start: int, stop: int, out: numpy.ndarray=None) -> numpy.array:
+        return _into(self.function(self.generator.get_range(start, stop)), out)
 
 
 class AbsoluteOperator(ApplyFunctionOperator):
@@ -72,57 +113,189 @@ class AbsoluteOperator(ApplyFunctionOperator):
         super().__init__(numpy.absolute, generator)
 
 
+class RateScheduler:
+    def __init__(self, rate: float=None, burst_sec: float=None, min_sleep_sec: float=0.0005):
+        """
+        Schedules events at a target rate on the monotonic clock (in nanoseconds).
+
+        Every event (or group of events) moves an absolute deadline forward, so that the time spent generating
+        and the inaccuracy of the sleeps do not accumulate. Waits shorter than min_sleep_sec are skipped: the
+        following events are then emitted as a burst, until the wait they add up to is worth sleeping.
+        When the consumer is late, burst_sec bounds how much of the delay is caught up afterwards, like the
+        capacity of a token bucket.
+
+        :param rate: the target number of events per second (required by wait(n) without delay_sec and by ticks)
+        :param burst_sec: the maximum delay, in seconds, caught up by emitting faster than the rate (no limit by default)
+        :param min_sleep_sec: the shortest wait actually slept
+        """
+        self.rate = rate
+        self.burst_ns = None if burst_sec is None else int(burst_sec * 1e9)
+        self.min_sleep_ns = int(min_sleep_sec * 1e9)
+
+        self.start_ns = None
+        self.scheduled_ns = 0.0
+        self.events = 0
+
+    def advance(self, n: int=1, delay_sec: float=None) -> float:
+        """
+        Schedules n events and returns the number of seconds to wait before emitting them.
+
+        :param n: the number of events
+        :param delay_sec: the delay of the events, n / rate by default
+        """
+        now = time.monotonic_ns()
+        if self.start_ns is None:
+            self.start_ns = now
+        if self.burst_ns is not None:
+            self.scheduled_ns = max(self.scheduled_ns, now - self.start_ns - self.burst_ns)
+        self.events += n
+        self.scheduled_ns += n * 1e9 / self.rate if delay_sec is None else delay_sec * 1e9
+        wait = self.start_ns + self.scheduled_ns - now
+        return wait / 1e9 if wait >= self.min_sleep_ns else 0.0
+
+    def wait(self, n: int=1, delay_sec: float=None):
+        """
+        Schedules n events and sleeps until they are due, see advance.
+        """
+        delay = self.advance(n, delay_sec)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self, n: int=1, delay_sec: float=None):
+        """
+        Schedules n events and waits until they are due without blocking the event loop, see advance.
+        """
+        delay = self.advance(n, delay_sec)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def ticks(self, tick_sec: float) -> Iterable:
+        """
+        Sleeps until every wall-clock tick (the multiples of tick_sec since the epoch) and yields the number of events
+        due at this tick, so that whole batches can be emitted at the rate.
+        Missed ticks are caught up in the next one, within the limit of burst_sec.
+
+        :param tick_sec: the time between two ticks in seconds
+        """
+        tick_ns = int(tick_sec * 1e9)
+        offset = time.time_ns() - time.monotonic_ns()
+        next_tick = (time.monotonic_ns() + offset) // tick_ns * tick_ns + tick_ns
+        due = 0.0
+        while True:
+            wait = next_tick - offset - time.monotonic_ns()
+            if wait > 0:
+                time.sleep(wait / 1e9)
+            now = time.monotonic_ns()
+            if self.start_ns is None:
+                self.start_ns = now
+            missed = (now + offset - next_tick) // tick_ns
+            caught_up = missed if self.burst_ns is None else min(missed, self.burst_ns // tick_ns)
+            next_tick += (missed + 1) * tick_ns
+            due += self.rate * tick_sec * (caught_up + 1)
+            n = int(due)
+            due -= n
+            self.scheduled_ns = now - self.start_ns
+            self.events += n
+            yield n
+
+    def stats(self) -> dict:
+        """
+        Returns the target and achieved rates (in events per second), the number of events, the elapsed time and the
+        lag (how late the schedule is, negative when ahead) in seconds.
+        """
+        elapsed = 0 if self.start_ns is None else (time.monotonic_ns() - self.start_ns) / 1e9
+        return {
+            'target_rate': self.rate,
+            'achieved_rate': self.events / elapsed if elapsed > 0 else 0.0,
+            'events': self.events,
+            'elapsed_sec': elapsed,
+            'lag_sec': elapsed - self.scheduled_ns / 1e9,
+        }
+
+
 class TimeDelayedGenerator(Generator):
-    def __init__(self, generator: Generator, time_delay_sec: float=None, time_delay_generator: Generator=None):
+    def __init__(self, generator: Generator, time_delay_sec: float=None, time_delay_generator: Generator=None,
+                 rate: float=None, burst_sec: float=None, min_sleep_sec: float=0.0005):
         """
         The TimeDelayedGenerator gives a simple way to simulate a real application that returns data every 10 seconds for example.
-        You can either provide the time delay between each values in seconds or via a generator.
+        You can either provide the time delay between each values in seconds, a rate or a generator of delays.
 
         :param generator: the generator used to return values
-        :param time_delay_ms: the time to sleep in seconds before returning the next value
+        :param time_delay_sec: the time to sleep in seconds before returning the next value
         :param time_delay_generator: the time to sleep given by a generator in seconds before returning the next value
+        :param rate: the number of values to return per second, instead of time_delay_sec
+        :param burst_sec: see RateScheduler
+        :param min_sleep_sec: see RateScheduler
         """
         self.generator = generator
         self.time_delay_sec = time_delay_sec
         self.time_delay_generator = time_delay_generator
 
-        self.start_time = None
-        self.previous_time = None
+        if rate is None and time_delay_sec:
+            rate = 1 / time_delay_sec
+        self.scheduler = RateScheduler(rate=rate, burst_sec=burst_sec, min_sleep_sec=min_sleep_sec)
 
-    def get_single(self) -> float:
-        if self.time_delay_sec is not None:
-            td = self.time_delay_sec
+    def _delay(self, batch_size: int=None) -> float:
+        """
+        Schedules the next element (or the next batch of batch_size elements)
+        and returns the number of seconds to wait before returning it.
+        The first element is returned without waiting, whereas a batch always waits for the delay of its elements.
+        """
+        n = 1 if batch_size is None else batch_size
+        if self.time_delay_generator is None:
+            # Without a rate (time_delay_sec=0), the elements are returned without waiting
+            td = None if self.scheduler.rate is not None else 0.0
+        elif batch_size is None:
+            td = float(self.time_delay_generator.get_single())
         else:
-            td = self.time_delay_generator.get_single()
-        td = datetime.timedelta(seconds=td)
-
-        if self.start_time is None:
-            self.start_time = datetime.datetime.now()
-            self.previous_time = self.start_time
-            return self.generator.get_single()
+            td = float(numpy.sum(self.time_delay_generator.get_batch(batch_size=batch_size)))
 
-        while self.previous_time + td > datetime.datetime.now():
-            time.sleep(((td.seconds + td.microseconds / 1000000) / 5))
+        if batch_size is None and self.scheduler.start_ns is None:
+            td = 0.0
+        return self.scheduler.advance(n, delay_sec=td)
 
-        self.previous_time += td
+    def get_single(self) -> float:
+        delay = self._delay()
+        if delay > 0:
+            time.sleep(delay)
         return self.generator.get_single()
 
-    def get_batch(self, batch_size: int) -> numpy.array:
-        if self.time_delay_sec is not None:
-            td = self.time_delay_sec * batch_size
-        else:
-            td = float(numpy.sum(self.time_delay_generator.get_batch(batch_size=batch_size)))
-        td = datetime.timedelta(seconds=td)
-
-        if self.start_time is None:
-            self.start_time = datetime.datetime.now()
-            self.previous_time = self.start_time
+    def get_batch(self, batch_size: int, out: numpy.ndarray=None) -> numpy.array:
+        delay = self._delay(batch_size)
+        if delay > 0:
+            time.sleep(delay)
+        if out is None:
+            return self.generator.get_batch(batch_size=batch_size)
+        return self.generator.get_batch(batch_size=batch_size, out=out)
+
+    async def aget_single(self) -> float:
+        delay = self._delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return await self.generator.aget_single()
+
+    async def aget_batch(self, batch_size: int, out: numpy.ndarray=None) -> numpy.array:
+        delay = self._delay(batch_size)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if out is None:
+            return await self.generator.aget_batch(batch_size=batch_size)
+        return await self.generator.aget_batch(batch_size=batch_size, out=out)
+
+    def stream_ticks(self, tick_sec: float) -> Iterable:
+        """
+        Yields, at every wall-clock tick, the batch of the values due at the rate since the previous tick.
 
-        while self.previous_time + td > datetime.datetime.now():
-            time.sleep(((td.seconds + td.microseconds / 1000000) / 5))
+        :param tick_sec: the time between two batches in seconds
+        """
+        for n in self.scheduler.ticks(tick_sec):
+            yield self.generator.get_batch(batch_size=n)
 
-        self.previous_time += td
-        return self.generator.get_batch(batch_size=batch_size)
+    def stats(self) -> dict:
+        """
+        Returns the target and achieved rates, see RateScheduler.stats.
+        """
+        return self.scheduler.stats()
 
 
 class CastOperator(Generator):
@@ -133,47 +306,158 @@ class CastOperator(Generator):
     def get_single(self) -> float:
         return self.generator.get_single()
 
-    def get_batch(self, batch_size: int) -> numpy.array:
-        return numpy.asarray(self.generator.get_batch(batch_size=batch_size), dtype=self.dtype)
+    def get_batch(self, batch_size: int, out: numpy.ndarray=None) -> numpy.array:
+        if out is None:
+            return numpy.asarray(self.generator.get_batch(batch_size=batch_size), dtype=self.dtype)
+        if out.dtype != numpy.dtype(self.dtype):
+            return _into(numpy.asarray(self.generator.get_batch(batch_size=batch_size), dtype=self.dtype), out)
+        return self.generator.get_batch(batch_size=batch_size, out=out)
+
+    def seek(self, n: int):
+        self.generator.seek(n)
+
+    def get_range(self, start: int, stop: int, out: numpy.ndarray=None) -> numpy.array:
+        return _into(numpy.asarray(self.generator.get_range(start, stop), dtype=self.dtype), out)
 
 
 class History(Generator):
     def __init__(self, generator, size, initial_values=None):
+        """
+        Keeps the last size values returned by a Generator in a ring buffer.
+        The sum, sum of squares, min and max of the window are maintained as values are added, so that
+        get_mean, get_var, get_min and get_max do not go through the whole window.
+
+        :param generator: the generator used to return values
+        :param size: the number of values kept
+        :param initial_values: the size values the window starts with, zeros by default
+        """
         if initial_values is None:
             self.history = numpy.zeros(size, dtype=numpy.float64)
         else:
             assert size == len(initial_values)
-            self.history = numpy.asarray(initial_values)
+            # A copy: the window is written in place, and initial_values are the ones the History was created with
+            self.history = numpy.array(initial_values)
         self.idx = 0
 
         self.generator = generator
         self.size = size
+        self._resync()
+
+    def _resync(self):
+        """
+        Recomputes the statistics from the whole window, so that rounding errors do not accumulate.
+        """
+        window = self.history.astype(numpy.float64, copy=False)
+        self._sum = window.sum()
+        self._sumsq = numpy.dot(window, window)
+        self._min = None
+        self._max = None
+        self._writes = 0
+
+    def _slices(self, n):
+        """
+        Returns the (one or two) slices of the n oldest values of the window.
+        """
+        end = self.idx + n
+        if end <= self.size:
+            return [slice(self.idx, end)]
+        return [slice(self.idx, self.size), slice(0, end - self.size)]
 
     def get_prev(self, i):
         return self.history[(self.size + self.idx + i) % self.size]
 
     def _put(self, e):
-        if self.idx == self.size:
-            self.idx = 0
+        old = float(self.history[self.idx])
         self.history[self.idx] = e
-        self.idx += 1
+        new = float(self.history[self.idx])
+        self.idx = (self.idx + 1) % self.size
+
+        self._sum += new - old
+        self._sumsq += new * new - old * old
+        if self._min is not None:
+            self._min = None if old <= self._min else min(self._min, new)
+        if self._max is not None:
+            self._max = None if old >= self._max else max(self._max, new)
+        self._writes += 1
+        if self._writes >= self.size:
+            self._resync()
+
+    def _put_batch(self, values):
+        n = len(values)
+        if n == 0:
+            return
+        if n >= self.size:
+            # The whole window is replaced by the last size values
+            values = values[n - self.size:]
+            self.idx = (self.idx + n) % self.size
+            self.history[self.idx:] = values[:self.size - self.idx]
+            self.history[:self.idx] = values[self.size - self.idx:]
+            self._resync()
+            return
+
+        offset = 0
+        for s in self._slices(n):
+            window = self.history[s]
+            old = window.astype(numpy.float64)
+            window[...] = values[offset:offset + len(window)]
+            new = window.astype(numpy.float64, copy=False)
+            offset += len(window)
+
+            self._sum += new.sum() - old.sum()
+            self._sumsq += numpy.dot(new, new) - numpy.dot(old, old)
+            if self._min is not None:
+                self._min = None if old.min() <= self._min else min(self._min, new.min())
+            if self._max is not None:
+                self._max = None if old.max() >= self._max else max(self._max, new.max())
+        self.idx = (self.idx + n) % self.size
+        self._writes += n
+        if self._writes >= self.size:
+            self._resync()
+
+    def get_oldest(self, n):
+        """
+        Returns a copy of the n (at most size) oldest values of the window, the next ones to be replaced.
+        """
+        slices = self._slices(n)
+        if len(slices) == 1:
+            return self.history[slices[0]].copy()
+        return numpy.concatenate([self.history[s] for s in slices])
 
     def get_single(self) -> float:
         e = self.generator.get_single()
         self._put(e)
         return e
 
-    def get_batch(self, batch_size: int) -> numpy.array:
-        vals = self.generator.get_batch(batch_size)
-        for e in vals:
-            self._put(e)
+    def get_batch(self, batch_size: int, out: numpy.ndarray=None) -> numpy.array:
+        vals = self.generator.get_batch(batch_size) if out is None else self.generator.get_batch(batch_size, out=out)
+        self._put_batch(vals)
         return vals
 
+    def get_sum(self):
+        return self._sum
+
     def get_mean(self):
-        return numpy.sum(self.history) / self.size
+        return self._sum / self.size
+
+    def get_var(self):
+        mean = self._sum / self.size
+        return max(self._sumsq / self.size - mean * mean, 0.0)
+
+    def get_min(self):
+        if self._min is None:
+            # An extreme value left the window: the min is recomputed once, on demand
+            self._min = float(self.history.min())
+        return self._min
+
+    def get_max(self):
+        if self._max is None:
+            self._max = float(self.history.max())
+        return self._max
 
 
 class MeanHistory(Generator):
+    dtype = numpy.float64
+
     def __init__(self, generator, size, initial_values=None):
         self.generator = History(generator, size, initial_values=initial_values)
         self.delay = generator.delay if hasattr(generator, 'delay') else 0
@@ -183,3 +467,26 @@ class MeanHistory(Generator):
         self.generator.get_single()
         return res
 
+    def get_batch(self, batch_size: int, out: numpy.ndarray=None) -> numpy.array:
+        history = self.generator
+        if out is not None and out.dtype != numpy.float64:
+            return _into(self.get_batch(batch_size), out)
+        res = numpy.empty(batch_size, dtype=numpy.float64) if out is None else out
+        if batch_size == 0:
+            return res
+
+        # Like get_single, each mean is the one of the window before its value is added:
+        # the running sum, then the sum moved by the (added - evicted) values of the previous elements
+        running_sum = history.get_sum()
+        evicted = numpy.empty(batch_size, dtype=numpy.float64)
+        evicted[:history.size] = history.get_oldest(min(batch_size, history.size))
+        added = numpy.asarray(history.get_batch(batch_size)).astype(history.history.dtype, copy=False)
+        if batch_size > history.size:
+            evicted[history.size:] = added[:batch_size - history.size]
+
+        res[0] = running_sum
+        numpy.subtract(added[:-1], evicted[:-1], out=res[1:])
+        numpy.cumsum(res, out=res)
+        res /= history.size
+        return res
+
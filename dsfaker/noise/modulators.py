@@ -34,6 +34,6 @@ class ModulatorLinearInterpolation(Generator):
         # TODO
         raise NotImplementedError()
 
-    def get_batch(self, batch_size: int) -> numpy.array:
+    def get_batch(self, batch_size: int, out: numpy.ndarray=None) -> numpy.array:
         # TODO
         raise NotImplementedError()
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+import importlib
+import json
+import os
+
+import numpy
+
+from .generators.base import Generator
+
+__all__ = ['to_spec', 'from_spec', 'dumps', 'loads', 'dump', 'load']
+
+VERSION = 1
+
+
+def _path(obj) -> str:
+    """
+    Returns the module:qualname path of a class or a function, checking that it can be imported back.
+    """
+    if isinstance(obj, numpy.ufunc):
+        path = 'numpy:' + obj.__name__
+    else:
+        path = '{}:{}'.format(getattr(obj, '__module__', None), getattr(obj, '__qualname__', None))
+    try:
+        found = _import(path)
+    except (ImportError, AttributeError, ValueError):
+        found = None
+    if found is not obj:
+        raise ValueError("{!r} cannot be imported back from {}: only the functions and classes defined at the top "
+                         "level of a module can be described".format(obj, path))
+    return path
+
+
+def _import(path: str):
+    module, sep, qualname = path.partition(':')
+    if not sep:
+        raise ValueError("{!r} is not a module:qualname path".format(path))
+    obj = importlib.import_module(module)
+    for name in qualname.split('.'):
+        obj = getattr(obj, name)
+    return obj
+
+
+def _encode_array(value) -> dict:
+    dtype = value.dtype
+    if dtype.kind in 'Mm':
+        values = value.view(numpy.int64).tolist()
+    elif dtype.kind in 'biufU?':
+        values = value.tolist()
+    else:
+        raise ValueError("arrays of dtype {} cannot be described".format(dtype))
+    return {'$array': values, 'dtype': numpy.lib.format.dtype_to_descr(dtype)}
+
+
+def _decode_array(spec: dict):
+    dtype = numpy.lib.format.descr_to_dtype(spec['dtype'])
+    if dtype.kind in 'Mm':
+        return numpy.array(spec['$array'], dtype=numpy.int64).view(dtype)
+    return numpy.array(spec['$array'], dtype=dtype)
+
+
+class _Encoder:
+    def __init__(self, generator: Generator):
+        self.counts = {}
+        self.ids = {}
+        self._count(generator)
+
+    def _count(self, value):
+        if isinstance(value, Generator):
+            self.counts[id(value)] = self.counts.get(id(value), 0) + 1
+            if self.counts[id(value)] > 1:
+                return
+            value = _init_args(value)
+            value = list(value['args']) + list(value['kwargs'].values())
+        if isinstance(value, dict):
+            value = list(value.keys()) + list(value.values())
+        if isinstance(value, (list, tuple)):
+            for v in value:
+                self._count(v)
+
+    def encode(self, value):
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, Generator):
+            return self._encode_generator(value)
+        if isinstance(value, list):
+            return [self.encode(v) for v in value]
+        if isinstance(value, tuple):
+            return {'$tuple': [self.encode(v) for v in value]}
+        if isinstance(value, dict):
+            if all(isinstance(k, str) and not k.startswith('$') for k in value):
+                return {k: self.encode(v) for k, v in value.items()}
+            return {'$dict': [[self.encode(k), self.encode(v)] for k, v in value.items()]}
+        if isinstance(value, numpy.random.SeedSequence):
+            return {'$seed_sequence': self.encode(value.entropy), 'spawn_key': list(value.spawn_key)}
+        if isinstance(value, (numpy.ndarray, numpy.generic)):
+            spec = _encode_array(numpy.asarray(value))
+            if isinstance(value, numpy.generic):
+                spec['scalar'] = True
+            return spec
+        if isinstance(value, numpy.dtype):
+            return {'$dtype': numpy.lib.format.dtype_to_descr(value)}
+        if isinstance(value, type) or callable(value):
+            return {'$import': _path(value)}
+        raise ValueError("{!r} cannot be described".format(value))
+
+    def _encode_generator(self, generator: Generator) -> dict:
+        if id(generator) in self.ids:
+            return {'$ref': self.ids[id(generator)]}
+        spec = {'$class': _path(type(generator))}
+        if self.counts.get(id(generator), 0) > 1:
+            # Shared by several nodes: the other ones refer to it by its id
+            self.ids[id(generator)] = spec['$id'] = len(self.ids)
+        init_args = _init_args(generator)
+        if init_args['args']:
+            spec['args'] = [self.encode(v) for v in init_args['args']]
+        if init_args['kwargs']:
+            spec['kwargs'] = {k: self.encode(v) for k, v in init_args['kwargs'].items()}
+        return spec
+
+
+def _init_args(generator: Generator) -> dict:
+    try:
+        return generator.__dict__['_init_args']
+    except KeyError:
+        raise ValueError("{!r} has no recorded arguments: only the Generators created by calling their class "
+                         "can be described".format(generator))
+
+
+class _Decoder:
+    def __init__(self):
+        self.nodes = {}
+
+    def decode(self, spec):
+        if isinstance(spec, list):
+            return [self.decode(v) for v in spec]
+        if not isinstance(spec, dict):
+            return spec
+        if '$class' in spec:
+            cls = _import(spec['$class'])
+            generator = cls(*self.decode(spec.get('args', [])),
+                            **{k: self.decode(v) for k, v in spec.get('kwargs', {}).items()})
+            if '$id' in spec:
+                self.nodes[spec['$id']] = generator
+            return generator
+        if '$ref' in spec:
+            return self.nodes[spec['$ref']]
+        if '$tuple' in spec:
+            return tuple(self.decode(v) for v in spec['$tuple'])
+        if '$dict' in spec:
+            return {self.decode(k): self.decode(v) for k, v in spec['$dict']}
+        if '$seed_sequence' in spec:
+            return numpy.random.SeedSequence(self.decode(spec['$seed_sequence']), spawn_key=spec['spawn_key'])
+        if '$array' in spec:
+            value = _decode_array(spec)
+            return value[()] if spec.get('scalar') else value
+        if '$dtype' in spec:
+            return numpy.lib.format.descr_to_dtype(spec['$dtype'])
+        if '$import' in spec:
+            return _import(spec['$import'])
+        return {k: self.decode(v) for k, v in spec.items()}
+
+
+def to_spec(generator: Generator) -> dict:
+    """
+    Returns the spec of a Generator graph: a dict of JSON types describing how to build it again.
+
+    Every Generator is described by its class and the arguments it was created with (Generators, numbers, strings,
+    lists, tuples, dicts, numpy arrays, scalars and dtypes, seeds, and functions and classes defined at the top level of
+    a module, as module:qualname). A Generator used by several nodes is described once, the other nodes referring to it.
+    The spec describes the graph as it was created: the state of the Generators (the values already drawn, a reseed)
+    is not part of it, so that from_spec gives back the graph as it was just after its creation.
+
+    :param generator: the root of the graph
+    """
+    return {'dsfaker': VERSION, 'generator': _Encoder(generator).encode(generator)}
+
+
+def from_spec(spec: dict) -> Generator:
+    """
+    Builds a Generator graph from its spec (see to_spec).
+
+    :param spec: the spec of the graph
+    """
+    if spec.get('dsfaker') != VERSION:
+        raise ValueError("unsupported spec version {!r}".format(spec.get('dsfaker')))
+    return _Decoder().decode(spec['generator'])
+
+
+def dumps(generator: Generator, format: str='json') -> str:
+    """
+    Returns the spec of a Generator graph as a JSON or YAML (needs pyyaml) document.
+
+    :param generator: the root of the graph
+    :param format: json or yaml
+    """
+    spec = to_spec(generator)
+    if format == 'json':
+        return json.dumps(spec, indent=2)
+    if format == 'yaml':
+        return _yaml().safe_dump(spec, sort_keys=False)
+    raise ValueError("unknown format {!r}, expected json or yaml".format(format))
+
+
+def loads(document: str, format: str='json') -> Generator:
+    """
+    Builds a Generator graph from a JSON or YAML (needs pyyaml) spec document.
+
+    :param document: the spec
+    :param format: json or yaml
+    """
+    if format == 'json':
+        return from_spec(json.loads(document))
+    if format == 'yaml':
+        return from_spec(_yaml().safe_load(document))
+    raise ValueError("unknown format {!r}, expected json or yaml".format(format))
+
+
+def _yaml():
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError("YAML specs need pyyaml: pip install dsfaker[yaml]")
+    return yaml
+
+
+def _format(path: str) -> str:
+    return 'yaml' if os.path.splitext(path)[1].lower() in ('.yaml', '.yml') else 'json'
+
+
+def dump(generator: Generator, path: str):
+    """
+    Writes the spec of a Generator graph to a .json, .yaml or .yml file.
+    """
+    with open(path, 'w') as f:
+        f.write(dumps(generator, format=_format(path)))
+
+
+def load(path: str) -> Generator:
+    """
+    Builds a Generator graph from a .json, .yaml or .yml spec file.
+    """
+    with open(path) as f:
+        return loads(f.read(), format=_format(path))
@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+import csv
+import os
+import pickle
+import struct
+from typing import Callable
+
+import numpy
+
+from .generators.base import Generator
+from .generators.categorical import CategoricalArray
+
+__all__ = ['Writer', 'NpyWriter', 'RawWriter', 'CsvWriter', 'ArrowWriter', 'ParquetWriter', 'write', 'write_memmap']
+
+
+def _columns(batch) -> list:
+    """
+    Returns the (name, array) columns of a batch: a dict of arrays, a tuple of arrays (named f0, f1, ...),
+    a structured array or an array (named value).
+    """
+    if isinstance(batch, dict):
+        items = batch.items()
+    elif isinstance(batch, tuple):
+        items = (('f%d' % i, v) for i, v in enumerate(batch))
+    elif isinstance(batch, numpy.ndarray) and batch.dtype.names is not None:
+        items = ((name, batch[name]) for name in batch.dtype.names)
+    else:
+        items = [('value', batch)]
+    return [(name, numpy.asarray(v.decode() if isinstance(v, CategoricalArray) else v)) for name, v in items]
+
+
+def _array(batch) -> numpy.ndarray:
+    """
+    Returns a batch as a single array, dicts and tuples of columns becoming structured arrays.
+    """
+    if isinstance(batch, CategoricalArray):
+        return batch.decode()
+    if isinstance(batch, numpy.ndarray):
+        return batch
+    columns = _columns(batch)
+    res = numpy.empty(len(columns[0][1]), dtype=[(name, v.dtype, v.shape[1:]) for name, v in columns])
+    for name, v in columns:
+        res[name] = v
+    return res
+
+
+def _fits(dtype: numpy.dtype, into: numpy.dtype) -> bool:
+    """
+    Whether an array of dtype can be written as an array of dtype into: the same dtype, but for strings, which can be
+    narrower.
+    """
+    if dtype.names is not None and into.names is not None:
+        return dtype.names == into.names and all(_fits(dtype[name], into[name]) for name in dtype.names)
+    if dtype.kind in 'SU' and dtype.kind == into.kind:
+        return dtype.itemsize <= into.itemsize
+    return dtype == into
+
+
+class Writer:
+    def __init__(self, path: str):
+        """
+        Writes batches to a file, one at a time, so that the memory used does not depend on the number of rows.
+        Used as a context manager, the file is closed at the end of the block.
+
+        :param path: the file to write to
+        """
+        self.path = path
+        self.rows = 0
+
+    def write(self, batch):
+        """
+        Appends the rows of a batch to the file.
+
+        :param batch: an array, a structured array, or a dict or tuple of columns
+        """
+        raise NotImplementedError("write not implemented")
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class RawWriter(Writer):
+    def __init__(self, path: str):
+        """
+        Writes the raw bytes of the batches, without any header.
+        The file can be read back with numpy.fromfile given the dtype of the batches.
+        """
+        super().__init__(path)
+        self.file = open(path, 'wb')
+
+    def write(self, batch):
+        batch = numpy.ascontiguousarray(_array(batch))
+        # As bytes, whatever the dtype: the buffer protocol has no format for datetime64 and timedelta64
+        self.file.write(batch.view(numpy.uint8))
+        self.rows += len(batch)
+
+    def close(self):
+        self.file.close()
+
+
+class NpyWriter(RawWriter):
+    def __init__(self, path: str):
+        """
+        Writes the batches as a single .npy array.
+
+        The header is written before the first batch, with enough room for any number of rows,
+        and its shape is updated with the number of rows written when the file is closed.
+        A file closed without any batch holds an empty float64 array, as numpy.save(path, []) writes.
+        """
+        super().__init__(path)
+        self.dtype = None
+        self.shape = None
+        self.header_size = None
+
+    def _header(self, rows: int) -> bytes:
+        header = repr({'descr': numpy.lib.format.dtype_to_descr(self.dtype), 'fortran_order': False,
+                       'shape': (rows,) + self.shape})
+        if self.header_size is None:
+            # Room for the largest number of rows, aligned on 64 bytes as numpy does
+            size = 12 + len(header) + len(str(2 ** 63)) - len(str(rows)) + 1
+            self.header_size = -(-size // 64) * 64
+        header = header.ljust(self.header_size - 11) + '\n'
+        return numpy.lib.format.magic(1, 0) + struct.pack('<H', len(header)) + header.encode('latin1')
+
+    def write(self, batch):
+        batch = _array(batch)
+        if self.dtype is None:
+            self.dtype = batch.dtype
+            self.shape = batch.shape[1:]
+            self.file.write(self._header(0))
+        elif not _fits(batch.dtype, self.dtype) or batch.shape[1:] != self.shape:
+            raise ValueError("all the batches of a .npy file must have the same dtype and shape, the strings being no "
+                             "longer than the ones of the first batch")
+        super().write(batch.astype(self.dtype, copy=False))
+
+    def close(self):
+        if self.dtype is None:
+            self.dtype, self.shape = numpy.dtype(numpy.float64), ()
+        if not self.file.closed:
+            self.file.seek(0)
+            self.file.write(self._header(self.rows))
+        super().close()
+
+
+class CsvWriter(Writer):
+    def __init__(self, path: str, header: bool=True, **kwargs):
+        """
+        Writes the batches as CSV, one row per line and one column per field,
+        the subarrays of a field being written as field_0, field_1, ...
+
+        :param header: write the names of the columns on the first line
+        :param kwargs: the formatting parameters of csv.writer (delimiter, quoting, ...)
+        """
+        super().__init__(path)
+        self.header = header
+        self.file = open(path, 'w', newline='')
+        self.writer = csv.writer(self.file, **kwargs)
+
+    def write(self, batch):
+        names, columns = [], []
+        for name, v in _columns(batch):
+            v = v.reshape(len(v), -1)
+            if v.shape[1] == 1:
+                names.append(name)
+                columns.append(v[:, 0].astype(str))
+            else:
+                names.extend('{}_{}'.format(name, i) for i in range(v.shape[1]))
+                columns.extend(v[:, i].astype(str) for i in range(v.shape[1]))
+        if self.header and self.rows == 0:
+            self.writer.writerow(names)
+        self.writer.writerows(zip(*columns))
+        self.rows += len(columns[0]) if columns else 0
+
+    def close(self):
+        self.file.close()
+
+
+def _record_batch(pyarrow, batch):
+    arrays, names = [], []
+    for name, v in _columns(batch):
+        if v.ndim > 1:
+            values = pyarrow.array(numpy.ascontiguousarray(v).reshape(-1))
+            array = pyarrow.FixedSizeListArray.from_arrays(values, int(numpy.prod(v.shape[1:])))
+        else:
+            array = pyarrow.array(v)
+        arrays.append(array)
+        names.append(name)
+    return pyarrow.RecordBatch.from_arrays(arrays, names=names)
+
+
+class ArrowWriter(Writer):
+    def __init__(self, path: str):
+        """
+        Writes the batches as an Arrow IPC file, one record batch per batch (needs pyarrow).
+        The subarrays of a field are written as fixed size lists.
+        """
+        super().__init__(path)
+        try:
+            import pyarrow
+            import pyarrow.ipc
+        except ImportError:
+            raise ImportError("ArrowWriter needs pyarrow: pip install dsfaker[arrow]")
+        self.pyarrow = pyarrow
+        self.writer = None
+
+    def write(self, batch):
+        record_batch = _record_batch(self.pyarrow, batch)
+        if self.writer is None:
+            self.writer = self.pyarrow.ipc.new_file(self.path, record_batch.schema)
+        self.writer.write_batch(record_batch)
+        self.rows += record_batch.num_rows
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class ParquetWriter(Writer):
+    def __init__(self, path: str, **kwargs):
+        """
+        Writes the batches as a Parquet file, one row group per batch (needs pyarrow).
+
+        :param kwargs: the parameters of pyarrow.parquet.ParquetWriter (compression, ...)
+        """
+        super().__init__(path)
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("ParquetWriter needs pyarrow: pip install dsfaker[arrow]")
+        self.pyarrow = pyarrow
+        self.kwargs = kwargs
+        self.writer = None
+
+    def write(self, batch):
+        table = self.pyarrow.Table.from_batches([_record_batch(self.pyarrow, batch)])
+        if self.writer is None:
+            self.writer = self.pyarrow.parquet.ParquetWriter(self.path, table.schema, **self.kwargs)
+        self.writer.write_table(table)
+        self.rows += table.num_rows
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+WRITERS = {
+    'npy': NpyWriter,
+    'raw': RawWriter,
+    'bin': RawWriter,
+    'csv': CsvWriter,
+    'arrow': ArrowWriter,
+    'feather': ArrowWriter,
+    'parquet': ParquetWriter,
+}
+
+
+def _nbytes(batch) -> int:
+    return sum(v.nbytes for _, v in _columns(batch))
+
+
+def write(generator: Generator, path: str, nb_rows: int, batch_size: int=65536, format: str=None,
+          progress: Callable=None, **kwargs) -> int:
+    """
+    Writes nb_rows elements of a Generator (a Table for several columns) to a file, batch by batch:
+    a single batch is held in memory at a time, whatever the number of rows.
+
+    :param generator: the Generator of the rows
+    :param path: the file to write to
+    :param nb_rows: the number of rows to write
+    :param batch_size: the number of rows generated and written at a time
+    :param format: one of npy, raw (or bin), csv, arrow (or feather) and parquet, by default the extension of path
+    :param progress: called after every batch written, with its number of rows and of bytes (in memory)
+    :param kwargs: the parameters of the Writer
+    :return: the number of rows written
+    """
+    format = format or os.path.splitext(path)[1].lstrip('.').lower()
+    if format not in WRITERS:
+        raise ValueError("unknown format {!r}, expected one of {}".format(format, ', '.join(sorted(WRITERS))))
+
+    with WRITERS[format](path, **kwargs) as writer:
+        # Every batch is a new one: a pool of buffers would cut the strings longer than the ones of the first batch
+        for start in range(0, nb_rows, batch_size):
+            rows = min(batch_size, nb_rows - start)
+            batch = generator.get_batch(rows)
+            writer.write(batch)
+            if progress is not None:
+                progress(rows, _nbytes(batch))
+        if not nb_rows:
+            # An empty batch, so that an empty file still has the dtype (or the columns) of the Generator
+            writer.write(generator.get_batch(0))
+        return writer.rows
+
+
+def _save_progress(path: str, progress: dict):
+    """
+    Writes the progress marker of write_memmap atomically: a marker is either the previous one or the new one.
+    """
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        pickle.dump(progress, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def write_memmap(generator: Generator, path: str, nb_rows: int, batch_size: int=65536, dtype=None,
+                 checkpoint: int=16, resume: bool=True) -> numpy.memmap:
+    """
+    Fills a .npy file of nb_rows elements of a Generator (a structured Table for several columns) in place, through
+    numpy.memmap: every batch is generated directly into the file with `out`, without being staged in memory (but the
+    batches of a Generator returning CategoricalArray, which are decoded into the file).
+
+    Every `checkpoint` batches, the file is flushed and a progress marker (path + '.progress') records the number of
+    rows written with a copy of the Generator in its current state. If the filling is interrupted, calling write_memmap
+    again resumes it from the last marker, with the Generator of the marker, so that the file ends up with the same rows
+    as if it had not been interrupted. The marker is removed once the file is complete.
+
+    :param generator: the Generator of the rows (it must be picklable to checkpoint)
+    :param path: the .npy file to fill
+    :param nb_rows: the number of rows of the file
+    :param batch_size: the number of rows generated at a time
+    :param dtype: the dtype of the rows (a subarray dtype such as '(3,)f8' for rows of several values), by default
+        the dtype of the first batch
+    :param checkpoint: the number of batches between two progress markers
+    :param resume: resume from the progress marker if there is one, instead of starting over
+    :return: the file as a numpy.memmap
+    """
+    marker = path + '.progress'
+    start = 0
+    categorical = None
+    if resume and os.path.exists(marker):
+        with open(marker, 'rb') as f:
+            progress = pickle.load(f)
+        if progress['nb_rows'] != nb_rows:
+            raise ValueError("{} was started with {} rows, not {}".format(path, progress['nb_rows'], nb_rows))
+        start, generator = progress['rows'], progress['generator']
+        res = numpy.lib.format.open_memmap(path, mode='r+')
+    elif dtype is not None:
+        dtype = numpy.dtype(dtype)
+        res = numpy.lib.format.open_memmap(path, mode='w+', dtype=dtype.base, shape=(nb_rows,) + dtype.shape)
+    elif nb_rows > 0:
+        # The first batch gives the dtype and shape of the file
+        first = generator.get_batch(min(batch_size, nb_rows))
+        categorical = isinstance(first, CategoricalArray)
+        first = _array(first)
+        res = numpy.lib.format.open_memmap(path, mode='w+', dtype=first.dtype, shape=(nb_rows,) + first.shape[1:])
+        res[:len(first)] = first
+        start = len(first)
+    else:
+        raise ValueError("the dtype of an empty file must be given")
+
+    batches = 0
+    while start < nb_rows:
+        stop = min(start + batch_size, nb_rows)
+        out = res[start:stop]
+        # A CategoricalArray would write its codes into out: until it is known not to be one, a batch is drawn apart
+        batch = generator.get_batch(stop - start, out=out if categorical is False else None)
+        if categorical is None:
+            categorical = isinstance(batch, CategoricalArray)
+        if batch is not out:
+            out[...] = _array(batch)
+        start = stop
+        batches += 1
+        if batches % checkpoint == 0 and start < nb_rows:
+            res.flush()
+            _save_progress(marker, {'nb_rows': nb_rows, 'rows': start, 'generator': generator})
+
+    res.flush()
+    if os.path.exists(marker):
+        os.remove(marker)
+    return res
@@ -12,10 +12,18 @@ setup(name='dsfaker',
       author='dubrzr',
       author_email='nota@valid.addr',
       license='MIT',
+      python_requires='>=3.7',
       packages=['dsfaker',
                 'dsfaker.generators',
                 'dsfaker.noise'],
       install_requires=[
-            'numpy>=1.12.0',
+            'numpy>=1.17.0',
       ],
+      extras_require={
+            'arrow': ['pyarrow'],
+            'yaml': ['pyyaml'],
+      },
+      entry_points={
+            'console_scripts': ['dsfaker=dsfaker.cli:main'],
+      },
       zip_safe=False)
@@ -1,6 +1,11 @@
+import asyncio
+import csv
 import datetime
 from decimal import Decimal
+import os
+import pickle
 import re
+import time
 
 import numpy as np
 import pytest
@@ -10,13 +15,20 @@ from dsfaker.generators import Generator, ScalingOperator, RandomDatetime, Distr
     Dirichlet, Exponential, F, FNonCentral, Gamma, Geometric, Gumbel, Hypergeometric, Laplace, Logistic, Lognormal, \
     Multinomial, NormalMultivariate, Normal, Lomax, Poisson, Power, Randint, RandomSample, Rayleigh, Triangular, \
     Uniform, Vonmises, Wald, Weibull, Zipf, DistributionUnbounded, DistributionBounded, DistributionNonNegative, Sinh, \
-    Cosh, Tanh, Tan, BoundedGenerator, Choice, CastOperator, TimeDelayedGenerator, History, MeanHistory
+    Cosh, Tanh, Tan, BoundedGenerator, Choice, CastOperator, TimeDelayedGenerator, History, MeanHistory, ReduceOperator, \
+    Profiler, RateScheduler, CategoricalArray, ValueChoice
 from dsfaker.generators.autoincrement import Autoincrement, AutoincrementWithGenerator
+from dsfaker.generators.base import _payload, _rebuild
 from dsfaker.generators.series import RepeatPattern
 from dsfaker.generators.str import Regex
 from dsfaker.generators.trigonometric import Sin, Cos
+from dsfaker.generators.table import Table
 from dsfaker.generators.timeseries import TimeSeries
 from dsfaker.generators.utils import ConstantValueGenerator, BoundingOperator, ApplyFunctionOperator, AbsoluteOperator
+from dsfaker.cli import load, generate, main
+from dsfaker.noise import WhiteGaussianNoise
+from dsfaker.spec import to_spec, from_spec, dumps, loads, dump
+from dsfaker.writers import write, write_memmap, NpyWriter, CsvWriter
 
 
 class TestGenerator:
@@ -57,7 +69,165 @@ class TestGenerator:
 
         assert g1.get_single() == g2.get_single() - 1
 
+    def test_default_batch_inferred_dtype(self):
+        class Single(Generator):
+            def __init__(self):
+                self.i = 0
 
+            def get_single(self):
+                self.i += 1
+                return self.i
+
+        values = Single().get_batch(100)
+        assert values.dtype == np.asarray(1).dtype
+        assert list(values) == list(range(1, 101))
+        assert Single().get_batch(0).shape == (0,)
+
+    def test_default_batch_mixed_types(self):
+        class Mixed(Generator):
+            def __init__(self):
+                self.values = iter([1, 0.5, 2])
+
+            def get_single(self):
+                return next(self.values)
+
+        values = Mixed().get_batch(3)
+        assert values.dtype == np.float64
+        assert list(values) == [1, 0.5, 2]
+
+    def test_batch_without_out(self):
+        # Generators written before get_batch took out
+        class Old(Generator):
+            def get_single(self):
+                return 1
+
+            def get_batch(self, batch_size):
+                return np.ones(batch_size)
+
+        assert len(TimeSeries(Old(), Old()).get_batch(5)[1]) == 5
+        assert len(TimeDelayedGenerator(Old(), time_delay_sec=0.0001).get_batch(5)) == 5
+        assert len(History(Old(), 3).get_batch(5)) == 5
+
+    def test_default_batch_declared_dtype(self):
+        class Single(Generator):
+            dtype = np.float32
+
+            def get_single(self):
+                return 1
+
+        values = Single().get_batch(10)
+        assert values.dtype == np.float32
+        assert (values == 1).all()
+
+    def test_default_batch_strings(self):
+        class Single(Generator):
+            def __init__(self):
+                self.i = 0
+
+            def get_single(self):
+                self.i += 1
+                return 'a' * self.i
+
+        values = Single().get_batch(5)
+        assert list(values) == ['a', 'aa', 'aaa', 'aaaa', 'aaaaa']
+
+
+    def test_stream_batch_buffers(self):
+        g = Autoincrement()
+        c = 0
+        batches = []
+        for values in g.stream_batch(100, buffers=3):
+            for val in values:
+                assert val == c
+                c += 1
+            batches.append(values)
+            if len(batches) == 10:
+                break
+        assert batches[0] is batches[3] is batches[6] is batches[9]
+        assert batches[0] is not batches[1]
+
+    def test_stream_batch_buffers_owned(self):
+        rp = RepeatPattern([0, 1, 2, 3, 4, 5, 6, 7, 8, 9])
+        stream = rp.stream_batch(5, buffers=1)
+        for i in range(10):
+            assert list(next(stream)) == [(5 * i + j) % 10 for j in range(5)]
+        assert list(rp.pattern) == list(range(10))
+
+    def test_stream_batch_buffers_strings(self):
+        # The strings are not cut to the width of the first batch
+        stream = Regex('a{1,20}', seed=0).stream_batch(2, buffers=1)
+        regex = Regex('a{1,20}', seed=0)
+        for _ in range(100):
+            assert list(next(stream)) == list(regex.get_batch(2))
+
+        class Single(Generator):
+            def __init__(self):
+                self.i = 0
+
+            def get_single(self):
+                self.i += 1
+                return 'a' * self.i
+
+        stream = Single().stream_batch(2, buffers=1)
+        assert [list(next(stream)) for _ in range(2)] == [['a', 'aa'], ['aaa', 'aaaa']]
+
+    def test_reseed(self):
+        g1 = Normal() * 3 + Uniform(0, 1) - Autoincrement()
+        g2 = g1.copy()
+        g1.reseed(42)
+        g2.reseed(42)
+        assert np.array_equal(g1.get_batch(100), g2.get_batch(100))
+        g2.reseed(43)
+        assert not np.array_equal(g1.get_batch(100), g2.get_batch(100))
+
+    def test_parallel_stream_batch(self):
+        g = Normal() + Autoincrement()
+
+        def take(stream, nb):
+            return [next(stream) for _ in range(nb)]
+
+        batches = take(g.parallel_stream_batch(100, workers=2, seed=42), 6)
+        assert all(b.shape == (100,) for b in batches)
+        for b1, b2 in zip(batches, take(g.parallel_stream_batch(100, workers=2, seed=42), 6)):
+            assert np.array_equal(b1, b2)
+        assert not np.array_equal(batches[0], batches[1])
+        # The workers interleave the elements of Autoincrement
+        for i, batch in enumerate(batches):
+            assert np.allclose(batch.mean(), i * 100 + 49.5, atol=1)
+        batches = take(Autoincrement().parallel_stream_batch(3, workers=2), 4)
+        assert np.array_equal(np.concatenate(batches), np.arange(12))
+
+    def test_parallel_stream_batch_raises(self):
+        stream = Generator().parallel_stream_batch(10, workers=1)
+        with pytest.raises(NotImplementedError):
+            next(stream)
+
+    def test_prefetch_stream_batch(self):
+        expected = (Normal(seed=0) + Autoincrement()).stream_batch(100)
+        for kwargs in [{}, {'prefetch': 1, 'buffers': 2}, {'process': True}]:
+            g = Normal(seed=0) + Autoincrement()
+            stream = g.prefetch_stream_batch(100, **kwargs)
+            batches = [next(stream).copy() for _ in range(5)]
+            stream.close()
+            for b in batches:
+                assert np.array_equal(b, next(expected))
+            expected = (Normal(seed=0) + Autoincrement()).stream_batch(100)
+
+    def test_prefetch_stream_batch_buffers(self):
+        stream = Autoincrement().prefetch_stream_batch(10, prefetch=3, buffers=2)
+        b0 = next(stream)
+        b1 = next(stream)
+        time.sleep(0.05)
+        assert b0[0] == 0 and b1[0] == 10
+        stream.close()
+
+    def test_prefetch_stream_batch_raises(self):
+        for process in [False, True]:
+            stream = Generator().prefetch_stream_batch(10, process=process)
+            with pytest.raises(NotImplementedError):
+                next(stream)
+        with pytest.raises(ValueError):
+            next(Normal().prefetch_stream_batch(10, prefetch=0))
 
     def _get_two_unique_gen(self):
         va = np.random.randint(-1000, +1000, dtype=np.int32)
@@ -186,6 +356,178 @@ class TestGenerator:
         assert c.get_single() == - v
 
 
+class TestRange:
+    def _gens(self):
+        return [
+            lambda: Autoincrement(start=3, step=2),
+            lambda: Autoincrement(start=0.5, step=0.25, dtype=np.float64),
+            lambda: RepeatPattern([4, 8, 15, 16, 23, 42]),
+            lambda: RepeatPattern([4, 8, 15, 16, 23, 42], views=True),
+            lambda: Sin(Autoincrement()),
+            lambda: AbsoluteOperator(Cos(Autoincrement()) * 3 - 1),
+            lambda: ScalingOperator(Sin(Autoincrement()), lb=10, ub=20),
+            lambda: BoundingOperator(Autoincrement() - 50, lb=0, ub=20),
+            lambda: CastOperator(Autoincrement() / 3, dtype=np.int16),
+            lambda: (Autoincrement() * 2 + RepeatPattern([1, 2, 3]) - 1).compile(),
+        ]
+
+    def test_get_range(self):
+        for make in self._gens():
+            expected = make().get_batch(1000)
+            gen = make()
+            for start, stop in [(0, 10), (10, 11), (500, 1000), (999, 1000), (7, 7)]:
+                assert np.array_equal(gen.get_range(start, stop), expected[start:stop])
+            # The state is left untouched
+            assert np.array_equal(gen.get_batch(20), expected[:20])
+            out = np.empty(30, dtype=expected.dtype)
+            assert gen.get_range(100, 130, out=out) is out
+            assert np.array_equal(out, expected[100:130])
+
+    def test_seek(self):
+        for make in self._gens():
+            expected = make().get_batch(1000)
+            gen = make()
+            gen.seek(600)
+            assert np.array_equal(gen.get_batch(100), expected[600:700])
+            gen.seek(5)
+            assert gen.get_batch(1)[0] == expected[5]
+
+    def test_shards(self):
+        gen = Sin(Autoincrement()) + RepeatPattern(np.arange(7))
+        shards = [gen.get_range(i * 250, (i + 1) * 250) for i in range(4)]
+        assert np.array_equal(np.concatenate(shards), gen.get_batch(1000))
+
+    def test_raises(self):
+        with pytest.raises(NotImplementedError):
+            Normal().get_range(0, 10)
+        with pytest.raises(NotImplementedError):
+            (Autoincrement() + Normal()).seek(10)
+
+
+class TestCompiledOperator:
+    def _get_tree(self):
+        a = Normal(seed=1)
+        b = Normal(seed=2)
+        c = Autoincrement()
+        return a * 3 + (b - c) * 2 - c / 4
+
+    def test_values_batch(self):
+        tree = self._get_tree()
+        compiled = self._get_tree().compile()
+        for _ in range(10):
+            nb = np.random.randint(2, 1000)
+            assert np.array_equal(tree.get_batch(nb), compiled.get_batch(nb))
+
+    def test_values_single(self):
+        tree = self._get_tree()
+        compiled = self._get_tree().compile()
+        for _ in range(100):
+            assert tree.get_single() == compiled.get_single()
+
+    def test_results_not_shared(self):
+        compiled = self._get_tree().compile()
+        first = compiled.get_batch(100)
+        saved = first.copy()
+        second = compiled.get_batch(100)
+        assert first is not second
+        assert np.array_equal(first, saved)
+
+    def test_custom_reduce_lambda(self):
+        tree = ReduceOperator(Autoincrement(), 2, reduce_lambda=lambda a, b: a * 10 + b) + 1
+        assert list(tree.compile().get_batch(3)) == [3, 13, 23]
+
+
+class TestOut:
+    def _check(self, make, dtype=np.float64, nb_batches=5):
+        g1 = make()
+        g2 = make()
+        for _ in range(nb_batches):
+            nb = np.random.randint(2, 1000)
+            out = np.empty(nb, dtype=dtype)
+            values = g2.get_batch(nb, out=out)
+            assert values is out
+            assert np.array_equal(g1.get_batch(nb).astype(dtype), out)
+
+    def test_default(self):
+        self._check(lambda: MeanHistory(Autoincrement(start=4), 4, initial_values=[0, 1, 2, 3]))
+
+    def test_distribution(self):
+        self._check(lambda: Normal(seed=42))
+        self._check(lambda: Uniform(0, 1, seed=1))
+
+    def test_reduce_operator(self):
+        self._check(lambda: Autoincrement() * 3 + Normal(seed=1) - 2)
+        self._check(lambda: (Autoincrement() * 3 + Normal(seed=1) - 2).compile())
+        self._check(lambda: (Autoincrement() * 3 + 2).compile(), dtype=np.int64)
+
+    def test_scaling_operator(self):
+        self._check(lambda: ScalingOperator(Uniform(0, 1, seed=1), lb=-10, ub=10))
+        self._check(lambda: ScalingOperator(Uniform(0, 1, seed=1), lb=-10, ub=10, dtype=np.float32), dtype=np.float32)
+
+    def test_bounding_operator(self):
+        self._check(lambda: BoundingOperator(Normal(seed=1), lb=-0.5, ub=0.5))
+        self._check(lambda: BoundingOperator(Autoincrement(), lb=10, ub=500), dtype=np.int64)
+
+    def test_cast_operator(self):
+        self._check(lambda: CastOperator(Normal(seed=1, std=100), dtype=np.int16), dtype=np.int16)
+        self._check(lambda: CastOperator(Normal(seed=1, std=100), dtype=np.int16))
+
+    def test_autoincrement(self):
+        self._check(lambda: Autoincrement(start=-42, step=3), dtype=np.int64)
+        self._check(lambda: Autoincrement(start=-4.2, step=4.2, dtype=np.float64))
+        self._check(lambda: AutoincrementWithGenerator(start=3, generator=Normal(seed=1)))
+
+    def test_repeat_pattern(self):
+        self._check(lambda: RepeatPattern([0, 1, 2, 3, 4, 5, 6]), dtype=np.int64, nb_batches=20)
+
+    def test_trigo(self):
+        self._check(lambda: Sin(Autoincrement()))
+
+    def test_random_datetime(self):
+        self._check(lambda: RandomDatetime(Uniform(0, 1, seed=1), start=np.datetime64("1950-01-01"),
+                                           end=np.datetime64("2042-01-01"), unit="D"), dtype='datetime64[D]')
+
+    def test_time_series(self):
+        ts = TimeSeries(time_gen=Autoincrement(), data_gen=Normal(seed=1))
+        out = (np.empty(10, dtype=np.int64), np.empty(10))
+        tt, vv = ts.get_batch(10, out=out)
+        assert tt is out[0] and vv is out[1]
+        assert list(tt) == list(range(10))
+
+
+class TestProfiler:
+    def test_stats(self):
+        gen = ScalingOperator(Uniform(0, 1, seed=0), -1, 1) + AbsoluteOperator(Normal(seed=1))
+        expected = gen.copy().get_batch(100)
+        with Profiler(gen) as profiler:
+            assert np.array_equal(gen.get_batch(100), expected)
+            gen.get_single()
+            gen.get_batch(10, out=np.empty(10))
+
+        normal = profiler.stats[id(gen.generators[1].generator)]
+        assert normal['get_batch']['calls'] == 2
+        assert normal['get_batch']['rows'] == 110
+        # The ReduceOperator writes into out, but still allocates the batches of its children
+        assert normal['get_batch']['bytes'] == 880
+        assert profiler.stats[id(gen)]['get_batch']['bytes'] == 800
+        assert normal['get_single']['calls'] == 1
+        root = profiler.stats[id(gen)]['get_batch']
+        assert root['time'] >= root['self_time'] >= 0
+        assert root['time'] >= normal['get_batch']['time']
+
+        report = profiler.report()
+        assert 'AddOperator' in report and '    Normal' in report
+
+    def test_detach(self):
+        gen = AbsoluteOperator(Normal(seed=1))
+        profiler = Profiler(gen).attach()
+        assert 'get_batch' in vars(gen.generator)
+        profiler.detach()
+        assert 'get_batch' not in vars(gen) and 'get_batch' not in vars(gen.generator)
+        gen.get_batch(10)
+        assert profiler.stats == {}
+
+
 class TestBoundingOperator:
     def test_values_single(self):
         n = Sin() * ConstantValueGenerator(50, dtype=np.uint16)
@@ -326,6 +668,26 @@ class TestRepeatPattern:
                 assert val == idx % 10
                 idx += 1
 
+    def test_views(self):
+        pattern = np.arange(10)
+        rp = RepeatPattern(pattern, views=True)
+        first = rp.get_batch(4)
+        assert np.shares_memory(first, rp.pattern)
+        assert not first.flags.writeable
+        idx = 4
+        batches = [(0, first)]
+        for nb in [6, 3, 25, 7, 100, 1, 1000]:
+            batch = rp.get_batch(nb)
+            assert not batch.flags.writeable
+            batches.append((idx, batch))
+            idx += nb
+        for start, batch in batches:
+            # Earlier views are never overwritten
+            assert np.array_equal(batch, (start + np.arange(len(batch))) % 10)
+        with pytest.raises(ValueError):
+            first[0] = 42
+        assert rp.pattern[0] == 0
+
 
 class TestAutoincrement:
     def test_type(self):
@@ -357,6 +719,23 @@ class TestAutoincrement:
 
 
 class TestAutoincrementRandom:
+    def test_narrow_increments(self):
+        # The increments are accumulated in the default integer, not in int8
+        gen = AutoincrementWithGenerator(0, CastOperator(Randint(100, 101, seed=0), np.int8))
+        assert np.array_equal(gen.get_batch(10), np.arange(0, 1000, 100))
+        assert gen.get_batch(2)[0] == 1000
+
+    def test_child_without_out(self):
+        # Generators written before get_batch took out
+        class Old(Generator):
+            def get_batch(self, batch_size):
+                return np.full(batch_size, 2)
+
+        for dtype in (None, np.int64):
+            gen = AutoincrementWithGenerator(0, Old(), dtype=dtype)
+            assert np.array_equal(gen.get_batch(3), [0, 2, 4])
+            assert np.array_equal(gen.get_batch(3), [6, 8, 10])
+
     def _get_gen(self):
         start = np.random.randint(-50, +50)
         step = np.random.randint(-10, 10)
@@ -390,6 +769,32 @@ class TestAutoincrementRandom:
                 assert val == start + (count + j) * step
             count += nb
 
+    def test_batch_single(self):
+        ai1 = AutoincrementWithGenerator(start=3.5, generator=Normal(seed=0))
+        ai2 = AutoincrementWithGenerator(start=3.5, generator=Normal(seed=0))
+        for nb in [1, 10, 0, 1000, 7]:
+            assert np.allclose(ai1.get_batch(nb), [ai2.get_single() for _ in range(nb)])
+        assert ai1.dtype == np.float64
+        out = np.empty(50)
+        assert ai1.get_batch(50, out=out) is out
+        assert np.allclose(out, [ai2.get_single() for _ in range(50)])
+
+    def test_dtype(self):
+        ai = AutoincrementWithGenerator(start=0, generator=Randint(0, 10, seed=0), dtype=np.int16)
+        values = ai.get_batch(100)
+        assert values.dtype == np.int16
+        assert np.array_equal(values, np.concatenate([[0], np.cumsum(Randint(0, 10, seed=0).get_batch(99))]))
+        out = np.empty(100, dtype=np.float32)
+        ai.get_batch(100, out=out)
+        assert out[0] == values[-1] + Randint(0, 10, seed=0).get_batch(100)[-1]
+
+        walk = AutoincrementWithGenerator(start=0, generator=ConstantValueGenerator(0.1, dtype=np.float64),
+                                          dtype=np.longdouble)
+        for _ in range(10):
+            values = walk.get_batch(100000)
+        assert values.dtype == np.longdouble
+        assert abs(values[-1] - np.longdouble(999999) / 10) <= abs(np.cumsum(np.full(999999, 0.1))[-1] - 99999.9)
+
 
 class TestTimeSeries:
     def _get_ts(self):
@@ -418,6 +823,334 @@ class TestTimeSeries:
                 assert v == 42
 
 
+class TestTable:
+    def _get_table(self, **kwargs):
+        return Table({'id': Autoincrement(),
+                      ('time', 'value'): TimeSeries(Autoincrement(), Normal(seed=0)),
+                      'choice': ValueChoice(['a', 'bb'], categorical=True, seed=0),
+                      'dirichlet': Dirichlet(alpha=[1, 1, 1], seed=0)},
+                     dtypes={'id': np.uint32}, **kwargs)
+
+    def test_structured(self):
+        table = self._get_table()
+        assert table.dtype is None
+        batch = table.get_batch(10)
+        assert batch.dtype.names == ('id', 'time', 'value', 'choice', 'dirichlet')
+        assert batch['id'].dtype == np.uint32
+        assert batch['choice'].dtype == np.dtype('U2')
+        assert batch['dirichlet'].shape == (10, 3)
+        assert table.dtype == batch.dtype
+        assert np.array_equal(batch['id'], np.arange(10))
+        batch = table.get_batch(5)
+        assert np.array_equal(batch['time'], np.arange(10, 15))
+        assert set(batch['choice']) <= {'a', 'bb'}
+        out = np.empty(5, dtype=table.dtype)
+        assert table.get_batch(5, out=out) is out
+        assert np.array_equal(out['id'], np.arange(15, 20))
+
+    def test_columns(self):
+        structured = self._get_table().get_batch(20)
+        columns = self._get_table(structured=False).get_batch(20)
+        assert list(columns) == ['id', 'time', 'value', 'choice', 'dirichlet']
+        for name, column in columns.items():
+            assert column.flags.c_contiguous
+            assert np.array_equal(column, structured[name])
+
+    def test_single(self):
+        row = self._get_table().get_single()
+        assert row['id'] == 0 and row['time'] == 0
+        assert row['choice'] in ('a', 'bb')
+        assert len(row['dirichlet']) == 3
+
+    def test_range(self):
+        table = Table({'id': Autoincrement(), 'value': Normal(seed=0, counter=True)})
+        batch = table.get_batch(30)
+        assert np.array_equal(table.get_range(10, 20), batch[10:20])
+        table.seek(25)
+        assert np.array_equal(table.get_batch(5), batch[25:])
+
+    def test_raises(self):
+        with pytest.raises(ValueError):
+            Table({'a': Normal(), ('a', 'b'): TimeSeries(Autoincrement(), Normal())})
+
+    def test_strings(self):
+        table = Table({'s': Regex('a{1,6}', seed=0)}, dtypes={'s': 'U6'})
+        assert set(np.char.str_len(table.get_batch(100)['s'])) == set(range(1, 7))
+        with pytest.raises(ValueError):
+            Table({'s': Regex('a{1,6}', seed=0)}, dtypes={'s': 'U3'}).get_batch(100)
+        # The width inferred from the first batch does not truncate the next ones either
+        table = Table({'s': Regex('a{1,6}', seed=1)})
+        assert table.get_batch(1).dtype == np.dtype([('s', 'U3')])
+        with pytest.raises(ValueError):
+            table.get_batch(100)
+
+
+class TestWriters:
+    def _get_table(self):
+        return Table({'id': Autoincrement(), 'value': Normal(seed=0), 'choice': ValueChoice(['a', 'b,c'], seed=0),
+                      'dirichlet': Dirichlet(alpha=[1, 1], seed=0)}, dtypes={'id': np.uint32})
+
+    def test_npy(self, tmp_path):
+        assert write(self._get_table(), str(tmp_path / 'table.npy'), 1005, batch_size=100) == 1005
+        res = np.load(str(tmp_path / 'table.npy'))
+        assert np.array_equal(res, self._get_table().get_batch(1005))
+
+        assert write(Dirichlet(alpha=[1, 1, 1], seed=0), str(tmp_path / 'values.npy'), 10, batch_size=3) == 10
+        assert np.array_equal(np.load(str(tmp_path / 'values.npy')), Dirichlet(alpha=[1, 1, 1], seed=0).get_batch(10))
+
+        with NpyWriter(str(tmp_path / 'empty.npy')):
+            pass
+        assert np.load(str(tmp_path / 'empty.npy')).shape == (0,)
+        assert write(self._get_table(), str(tmp_path / 'empty.npy'), 0) == 0
+        assert np.load(str(tmp_path / 'empty.npy')).dtype == self._get_table().get_batch(1).dtype
+
+        with NpyWriter(str(tmp_path / 'raises.npy')) as writer:
+            writer.write(np.zeros(3))
+            with pytest.raises(ValueError):
+                writer.write(np.zeros(3, dtype=np.int8))
+
+    def test_raw(self, tmp_path):
+        assert write(Normal(seed=0), str(tmp_path / 'values.bin'), 10, batch_size=4) == 10
+        assert np.array_equal(np.fromfile(str(tmp_path / 'values.bin')), Normal(seed=0).get_batch(10))
+
+    def test_datetimes(self, tmp_path):
+        def dates():
+            return Table({'id': Autoincrement(),
+                          'date': RandomDatetime(Uniform(0, 1, seed=0), np.datetime64('2000-01-01'),
+                                                 np.datetime64('2001-01-01'), 'D')})
+        write(dates(), str(tmp_path / 'dates.npy'), 10, batch_size=4)
+        assert np.array_equal(np.load(str(tmp_path / 'dates.npy')), dates().get_batch(10))
+        write(dates(), str(tmp_path / 'dates.bin'), 10, batch_size=4)
+        assert np.array_equal(np.fromfile(str(tmp_path / 'dates.bin'), dtype=dates().get_batch(1).dtype),
+                              dates().get_batch(10))
+
+    def test_batches(self, tmp_path):
+        # Every batch is generated anew: the strings are not cut to the width of the first batch
+        write(Regex('a{1,20}', seed=0), str(tmp_path / 'strings.csv'), 200, batch_size=2)
+        regex = Regex('a{1,20}', seed=0)
+        expected = [s for _ in range(100) for s in regex.get_batch(2)]
+        with open(str(tmp_path / 'strings.csv')) as f:
+            assert f.read().split()[1:] == expected
+        write(Regex('a{1,3}', seed=0), str(tmp_path / 'strings.npy'), 1000, batch_size=300)
+        assert set(np.load(str(tmp_path / 'strings.npy'))) <= {'a', 'aa', 'aaa'}
+        with pytest.raises(ValueError):
+            write(Regex('a{1,20}', seed=0), str(tmp_path / 'strings.npy'), 200, batch_size=2)
+
+        class Old(Generator):
+            def get_batch(self, batch_size):
+                return np.ones(batch_size)
+
+        assert write(Old(), str(tmp_path / 'old.npy'), 10, batch_size=4) == 10
+
+    def test_csv(self, tmp_path):
+        write(self._get_table(), str(tmp_path / 'table.csv'), 5, batch_size=2)
+        expected = self._get_table().get_batch(5)
+        with open(str(tmp_path / 'table.csv')) as f:
+            lines = list(csv.reader(f))
+        assert lines[0] == ['id', 'value', 'choice', 'dirichlet_0', 'dirichlet_1']
+        assert [int(l[0]) for l in lines[1:]] == list(range(5))
+        assert [float(l[1]) for l in lines[1:]] == list(expected['value'])
+        assert [l[2] for l in lines[1:]] == list(expected['choice'])
+
+        with CsvWriter(str(tmp_path / 'values.csv'), header=False) as writer:
+            writer.write(np.arange(3))
+        with open(str(tmp_path / 'values.csv')) as f:
+            assert f.read().split() == ['0', '1', '2']
+
+    def test_arrow(self, tmp_path):
+        pyarrow = pytest.importorskip('pyarrow')
+        import pyarrow.ipc
+        import pyarrow.parquet
+        expected = self._get_table().get_batch(10)
+        write(self._get_table(), str(tmp_path / 'table.arrow'), 10, batch_size=4)
+        write(self._get_table(), str(tmp_path / 'table.parquet'), 10, batch_size=4)
+        for table in (pyarrow.ipc.open_file(str(tmp_path / 'table.arrow')).read_all(),
+                      pyarrow.parquet.read_table(str(tmp_path / 'table.parquet'))):
+            assert table.num_rows == 10
+            assert table.column('id').to_pylist() == list(range(10))
+            assert np.array_equal(np.array(table.column('dirichlet').to_pylist()), expected['dirichlet'])
+
+    def test_raises(self, tmp_path):
+        with pytest.raises(ValueError):
+            write(Normal(), str(tmp_path / 'values.xyz'), 10)
+
+
+class _Interrupted(Exception):
+    pass
+
+
+class _Interrupting(Generator):
+    # Not an attribute of the instances, as they are pickled with their state when checkpointed
+    calls = 0
+
+    def __init__(self, generator):
+        self.generator = generator
+
+    def get_batch(self, batch_size: int, out: np.ndarray=None):
+        _Interrupting.calls -= 1
+        if _Interrupting.calls < 0:
+            raise _Interrupted()
+        return self.generator.get_batch(batch_size, out=out)
+
+
+class TestMemmap:
+    def _get_table(self):
+        return Table({'id': Autoincrement(), 'value': Normal(seed=0)}, dtypes={'id': np.uint32})
+
+    def test_values(self, tmp_path):
+        path = str(tmp_path / 'table.npy')
+        res = write_memmap(self._get_table(), path, 1000, batch_size=64, checkpoint=2)
+        assert isinstance(res, np.memmap)
+        assert np.array_equal(np.load(path), self._get_table().get_batch(1000))
+        assert not os.path.exists(path + '.progress')
+
+        path = str(tmp_path / 'values.npy')
+        write_memmap(Dirichlet(alpha=[1, 1, 1], seed=0), path, 100, batch_size=30, dtype='(3,)f8')
+        assert np.array_equal(np.load(path, mmap_mode='r'), Dirichlet(alpha=[1, 1, 1], seed=0).get_batch(100))
+
+    def test_categorical(self, tmp_path):
+        # The codes of a CategoricalArray are not written into the string file
+        expected = ValueChoice(['a', 'bb'], categorical=True, seed=0).get_batch(100).decode()
+        for dtype in ('U2', None):
+            path = str(tmp_path / 'choice-{}.npy'.format(dtype))
+            write_memmap(ValueChoice(['a', 'bb'], categorical=True, seed=0), path, 100, batch_size=30, dtype=dtype)
+            assert np.array_equal(np.load(path), expected)
+
+    def test_resume(self, tmp_path):
+        path = str(tmp_path / 'table.npy')
+        _Interrupting.calls = 8
+        with pytest.raises(_Interrupted):
+            write_memmap(_Interrupting(self._get_table()), path, 1000, batch_size=64, checkpoint=3)
+        assert os.path.exists(path + '.progress')
+        with pytest.raises(ValueError):
+            write_memmap(self._get_table(), path, 2000, batch_size=64)
+        _Interrupting.calls = 100
+        write_memmap(Normal(), path, 1000, batch_size=64)
+        assert np.array_equal(np.load(path), self._get_table().get_batch(1000))
+        assert not os.path.exists(path + '.progress')
+
+
+class TestCli:
+    def test_load(self, tmp_path):
+        assert isinstance(load('dsfaker.generators.distributions:Normal'), Normal)
+        assert isinstance(load('dsfaker.generators:autoincrement.Autoincrement'), Autoincrement)
+        with open(str(tmp_path / 'generator.pkl'), 'wb') as f:
+            pickle.dump(Normal(mean=5), f)
+        assert load(str(tmp_path / 'generator.pkl')).mean == 5
+        with pytest.raises(ValueError):
+            load('dsfaker.generators')
+        with pytest.raises(ValueError):
+            load('numpy:float64')
+
+    def test_generate(self, tmp_path):
+        table = Table({'id': Autoincrement(), 'value': Normal()}, dtypes={'id': np.uint32})
+        paths = generate(table, str(tmp_path / 'table.npy'), 1000, shards=3, workers=2, seed=42, batch_size=64,
+                         file=None)
+        assert paths == [str(tmp_path / 'table-{:05d}.npy'.format(i)) for i in range(3)]
+        res = np.concatenate([np.load(path) for path in paths])
+        assert np.array_equal(res['id'], np.arange(1000))
+        assert [len(np.load(path)) for path in paths] == [333, 333, 334]
+
+        # The same seed and shards give the same files, whatever the workers
+        paths = generate(table, str(tmp_path / 'again-{shard}.npy'), 1000, shards=3, workers=1, seed=42, batch_size=100,
+                         file=None)
+        assert np.array_equal(np.concatenate([np.load(path) for path in paths]), res)
+
+    def test_generate_seek_tree(self, tmp_path):
+        # The index-based Generators are moved to the first row of their shard, wherever they are in the tree
+        table = Table({'value': Normal(), 'id': Autoincrement()})
+        paths = generate(table, str(tmp_path / 'table.npy'), 10, shards=2, workers=1, seed=0, file=None)
+        assert np.array_equal(np.load(paths[1])['id'], np.arange(5, 10))
+
+        paths = generate(Normal(std=0) + Autoincrement() * 10, str(tmp_path / 'values.npy'), 10, shards=2, workers=1,
+                         seed=0, file=None)
+        assert np.array_equal(np.load(paths[1]), np.arange(50, 100, 10))
+
+    def test_generate_regex(self, tmp_path):
+        table = Table({'id': Autoincrement(), 'code': Regex(r'[A-Z]{2}\d{3}')}, dtypes={'code': 'U5'})
+        paths = generate(table, str(tmp_path / 'table.npy'), 100, shards=2, workers=2, seed=0, file=None)
+        res = np.concatenate([np.load(path) for path in paths])
+        assert np.array_equal(res['id'], np.arange(100))
+        assert all(re.fullmatch(r'[A-Z]{2}\d{3}', code) for code in res['code'])
+
+    def test_main(self, tmp_path, capsys):
+        assert main(['generate', 'dsfaker.generators.autoincrement:Autoincrement', '-n', '10', '-w', '1', '-s', '2',
+                     '-o', str(tmp_path / 'values.csv'), '--seed', '1']) == 0
+        out, err = capsys.readouterr()
+        assert out.split() == [str(tmp_path / 'values-00000.csv'), str(tmp_path / 'values-00001.csv')]
+        assert 'seed: 1' in err and 'rows/s' in err and 'MB/s' in err
+        with open(str(tmp_path / 'values-00001.csv')) as f:
+            assert f.read().split() == ['value', '5', '6', '7', '8', '9']
+        # More shards than rows: the empty shards are still valid files
+        assert main(['generate', 'dsfaker.generators.autoincrement:Autoincrement', '-n', '1', '-w', '1', '-s', '2',
+                     '-o', str(tmp_path / 'values.npy'), '-q']) == 0
+        assert [len(np.load(str(tmp_path / 'values-{:05d}.npy'.format(i)))) for i in range(2)] == [0, 1]
+        assert main([]) == 2
+
+
+class TestSpec:
+    def _get_table(self):
+        shared = Normal(seed=1)
+        return Table({'id': Autoincrement(dtype=np.uint32),
+                      ('time', 'value'): TimeSeries(Autoincrement(), shared * 2 + shared),
+                      'choice': ValueChoice(['a', 'bb'], seed=2, categorical=True),
+                      'date': RandomDatetime(Uniform(0, 1, seed=3), np.datetime64('2000-01-01'),
+                                             np.datetime64('2001-01-01'), 'D'),
+                      'sin': Sin(Uniform(0, 1, seed=4)),
+                      'regex': Regex('[a-z]{3}', seed=5),
+                      'noise': WhiteGaussianNoise(RepeatPattern(np.arange(5.)), Normal(seed=6)),
+                      'mean': MeanHistory(Normal(seed=7), 3),
+                      'cast': CastOperator(Uniform(0, 100, seed=8), np.int16)},
+                     dtypes={'regex': 'U3'})
+
+    def test_round_trip(self):
+        table = self._get_table()
+        expected = self._get_table().get_batch(20)
+        for format in ('json', 'yaml'):
+            if format == 'yaml':
+                pytest.importorskip('yaml')
+            res = loads(dumps(table, format=format), format=format)
+            assert np.array_equal(res.get_batch(20), expected)
+            # The shared Normal is built once
+            add = res.columns[('time', 'value')].data_gen
+            assert add.generators[0].generators[0] is add.generators[1]
+        assert to_spec(from_spec(to_spec(table))) == to_spec(table)
+
+    def test_distributions(self):
+        for d in TestDistributions()._get_all_distributions(seed=0):
+            assert np.array_equal(from_spec(to_spec(d)).get_batch(10), d.copy().get_batch(10))
+
+    def test_file(self, tmp_path):
+        dump(self._get_table(), str(tmp_path / 'table.json'))
+        assert np.array_equal(load(str(tmp_path / 'table.json')).get_batch(5), self._get_table().get_batch(5))
+
+    def test_raises(self):
+        with pytest.raises(ValueError):
+            to_spec(ApplyFunctionOperator(lambda x: x, Normal()))
+        with pytest.raises(ValueError):
+            to_spec(Normal(rng=np.random.default_rng(0)))
+        with pytest.raises(ValueError):
+            from_spec({'dsfaker': 0, 'generator': {}})
+
+    def test_history(self):
+        # Drawing values does not change the arguments the History was created with
+        values = np.arange(4)
+        gen = History(Autoincrement(start=10), 4, initial_values=values)
+        spec = dumps(gen)
+        gen.get_batch(3)
+        assert np.array_equal(values, np.arange(4))
+        assert dumps(gen) == spec
+
+    def test_workers(self):
+        # The workers rebuild the graph from its spec, or from its pickle when it cannot be described
+        payload = _payload(self._get_table())
+        assert payload[0] == 'spec'
+        assert np.array_equal(_rebuild(payload).get_batch(5), self._get_table().get_batch(5))
+        gen = Normal(rng=np.random.default_rng(0))
+        assert _payload(gen)[0] == 'pickle'
+        assert len(next(iter(gen.parallel_stream_batch(10, workers=1, seed=0)))) == 10
+
+
 class TestDate:
     def test_values_single(self):
         triangular_fun = BoundingOperator(
@@ -442,6 +1175,37 @@ class TestDate:
                 assert val == tmp[(count + j) % 4]
             count += nb
 
+    def test_uniform_int64(self):
+        start = np.datetime64('2000-01-01T00:00:00.000000000')
+        end = np.datetime64('2020-01-01T00:00:00.000000000')
+        rd = RandomDatetime(Uniform(0, 1, seed=0), start=start, end=end, unit='ns')
+        assert rd.direct
+        values = rd.get_batch(100000)
+        assert values.dtype == np.dtype('datetime64[ns]')
+        assert start <= values.min() and values.max() <= end
+        # Offsets are exact nanoseconds, not float64 values rounded to a multiple of 1024ns
+        assert np.count_nonzero(values.view(np.int64) % 1024) > 99000
+        assert start <= rd.get_single() <= end
+        assert np.array_equal(RandomDatetime(Uniform(0, 1, seed=0), start=start, end=end, unit='ns').get_batch(100000),
+                              values)
+
+        for gen in [RandomSample(seed=1), Uniform(-1, 1, seed=1, legacy=True)]:
+            rd = RandomDatetime(gen, start=np.datetime64('2000-01-01'), end=np.datetime64('2000-01-03'), unit='D')
+            assert set(rd.get_batch(1000)) == {np.datetime64('2000-01-01'), np.datetime64('2000-01-02'),
+                                               np.datetime64('2000-01-03')}
+        out = np.empty(10, dtype='datetime64[D]')
+        assert rd.get_batch(10, out=out) is out
+
+    def test_inverse(self):
+        rd1 = RandomDatetime(Beta(2, 2, seed=0), start=np.datetime64('2000-01-01'), end=np.datetime64('2010-01-01'),
+                             unit='s')
+        rd2 = RandomDatetime(Beta(2, 2, seed=0), start=np.datetime64('2000-01-01'), end=np.datetime64('2010-01-01'),
+                             unit='s')
+        assert not rd1.direct
+        assert np.array_equal(rd1.get_batch(100), [rd2.get_single() for _ in range(100)])
+        with pytest.raises(NotCompatibleGeneratorException):
+            RandomDatetime(Normal(), start=np.datetime64('2000-01-01'), end=np.datetime64('2010-01-01'), unit='s')
+
 
 class TestDistribution:
     def test_raise(self):
@@ -454,41 +1218,41 @@ class TestDistribution:
 
 
 class TestDistributions:
-    def _get_all_distributions(self):
+    def _get_all_distributions(self, **kwargs):
         distributions = [
-            Beta(a=2, b=2),
-            Binomial(n=20, p=0.5),
-            BinomialNegative(n=20, p=0.5),
-            CauchyStandard(),
-            Chisquare(k=6),
-            ChisquareNonCentral(k=4, nonc=1),
-            Dirichlet(alpha=[0.3, 0.3, 0.3]),
-            Exponential(),
-            F(dfnum=5, dfden=2),
-            FNonCentral(dfnum=10, dfden=20, nonc=5),
-            Gamma(k=1.0),
-            Geometric(p=0.5),
-            Gumbel(),
-            Hypergeometric(n=50, m=50, N=80),
-            Laplace(mu=-5, beta=4),
-            Logistic(mu=6, beta=2),
-            Lognormal(mu=0, sigma=1.5),
-            Lomax(a=2),
-            Multinomial(n=10, pvals=[1 / 10 for _ in range(10)]),
-            Normal(),
-            NormalMultivariate(mu=[0, 0], cov=[[1, 0], [0, 100]]),
-            Poisson(lam=4),
-            Power(a=2),
-            Randint(lb=-10, ub=20),
-            RandomSample(),
-            Rayleigh(sigma=1),
-            Triangular(left=10, mode=22, right=42),
-            Uniform(lb=-42, ub=84),
-            Vonmises(mu=-1, kappa=1),
-            Wald(mu=2, lam=0.2),
-            Weibull(a=0.5),
-            Zipf(a=2),
-            Choice(probabilities=[.05, .15, .05, .20, .25, .10, .20])
+            Beta(a=2, b=2, **kwargs),
+            Binomial(n=20, p=0.5, **kwargs),
+            BinomialNegative(n=20, p=0.5, **kwargs),
+            CauchyStandard(**kwargs),
+            Chisquare(k=6, **kwargs),
+            ChisquareNonCentral(k=4, nonc=1, **kwargs),
+            Dirichlet(alpha=[0.3, 0.3, 0.3], **kwargs),
+            Exponential(**kwargs),
+            F(dfnum=5, dfden=2, **kwargs),
+            FNonCentral(dfnum=10, dfden=20, nonc=5, **kwargs),
+            Gamma(k=1.0, **kwargs),
+            Geometric(p=0.5, **kwargs),
+            Gumbel(**kwargs),
+            Hypergeometric(n=50, m=50, N=80, **kwargs),
+            Laplace(mu=-5, beta=4, **kwargs),
+            Logistic(mu=6, beta=2, **kwargs),
+            Lognormal(mu=0, sigma=1.5, **kwargs),
+            Lomax(a=2, **kwargs),
+            Multinomial(n=10, pvals=[1 / 10 for _ in range(10)], **kwargs),
+            Normal(**kwargs),
+            NormalMultivariate(mu=[0, 0], cov=[[1, 0], [0, 100]], **kwargs),
+            Poisson(lam=4, **kwargs),
+            Power(a=2, **kwargs),
+            Randint(lb=-10, ub=20, **kwargs),
+            RandomSample(**kwargs),
+            Rayleigh(sigma=1, **kwargs),
+            Triangular(left=10, mode=22, right=42, **kwargs),
+            Uniform(lb=-42, ub=84, **kwargs),
+            Vonmises(mu=-1, kappa=1, **kwargs),
+            Wald(mu=2, lam=0.2, **kwargs),
+            Weibull(a=0.5, **kwargs),
+            Zipf(a=2, **kwargs),
+            Choice(probabilities=[.05, .15, .05, .20, .25, .10, .20], **kwargs)
         ]
         return distributions
 
@@ -538,6 +1302,96 @@ class TestDistributions:
                 d.get_batch(10000)
 
 
+    def test_bounds_batch_legacy(self):
+        for d in self._get_all_distributions(legacy=True):
+            assert isinstance(d.rs, np.random.RandomState)
+            if isinstance(d, DistributionBounded):
+                for v in d.get_batch(1000):
+                    assert d.lb <= v <= d.ub
+            else:
+                d.get_batch(1000)
+
+    def test_legacy_seed(self):
+        assert np.array_equal(Normal(seed=42, legacy=True).get_batch(100), np.random.RandomState(42).normal(size=100))
+        assert np.array_equal(Randint(lb=0, ub=10, seed=42, legacy=True).get_batch(100),
+                              np.random.RandomState(42).randint(0, 10, size=100))
+        gen = Normal(legacy=True)
+        gen.reseed(42)
+        assert np.array_equal(gen.get_batch(100), Normal(seed=42, legacy=True).get_batch(100))
+        gen.reseed(np.random.SeedSequence(42))
+        assert gen.legacy and len(gen.get_batch(10)) == 10
+
+    def test_bit_generator(self):
+        expected = np.random.Generator(np.random.SFC64(42)).normal(size=100)
+        assert np.array_equal(Normal(seed=42, bit_generator='SFC64').get_batch(100), expected)
+        assert np.array_equal(Normal(seed=42, bit_generator=np.random.SFC64).get_batch(100), expected)
+        assert np.array_equal(Normal(bit_generator=np.random.SFC64(42)).get_batch(100), expected)
+        assert np.array_equal(Normal(rng=np.random.Generator(np.random.SFC64(42))).get_batch(100), expected)
+        assert np.array_equal(Normal(seed=42).get_batch(100), np.random.default_rng(42).normal(size=100))
+
+    def test_out(self):
+        for make in [lambda: Normal(mean=3, std=2, seed=1), lambda: Exponential(beta=2, seed=1),
+                     lambda: Gamma(k=2, theta=3, seed=1), lambda: RandomSample(seed=1), lambda: Uniform(-3, 5, seed=1)]:
+            out = np.empty(1000)
+            assert make().get_batch(1000, out=out) is out
+            assert np.array_equal(make().get_batch(1000), out)
+
+
+    def test_threads(self):
+        nb = 4 * Distribution._THREADS_MIN_SLICE
+        values = Normal(seed=42, threads=4).get_batch(nb)
+        assert values.shape == (nb,)
+        assert np.array_equal(values, Normal(seed=42, threads=4).get_batch(nb))
+        assert abs(values.mean()) < 0.05
+
+        out = np.empty(nb)
+        assert Normal(seed=42, threads=4).get_batch(nb, out=out) is out
+        assert np.array_equal(values, out)
+
+        values = Dirichlet(alpha=[0.3, 0.3, 0.3], seed=42, threads=3).get_batch(nb)
+        assert values.shape == (nb, 3)
+        assert np.allclose(values.sum(axis=1), 1)
+
+    def test_threads_raise(self):
+        with pytest.raises(ValueError):
+            Normal(legacy=True, threads=4)
+
+    def test_counter(self):
+        sequential = self._get_all_distributions(seed=42, counter=True, block_size=100)
+        ranges = self._get_all_distributions(seed=42, counter=True, block_size=100)
+        for d1, d2 in zip(sequential, ranges):
+            values = [d1.get_single()] + list(d1.get_batch(250)) + [d1.get_single() for _ in range(3)] \
+                + list(d1.get_batch(146))
+            assert np.array_equal(np.asarray(values), d2.get_range(0, 400))
+            assert np.array_equal(d2.get_range(123, 377), np.asarray(values)[123:377])
+            assert len(d2.get_range(10, 10)) == 0
+            d2.seek(299)
+            assert np.array_equal(d2.get_single(), values[299])
+            assert np.array_equal(d2.get_batch(100), np.asarray(values[300:400]))
+            out = np.empty_like(d2.get_range(0, 50))
+            assert d2.get_range(50, 100, out=out) is out
+            assert np.array_equal(out, np.asarray(values[50:100]))
+
+        assert not np.array_equal(Normal(seed=1, counter=True).get_batch(100), Normal(seed=2, counter=True).get_batch(100))
+        d = Normal(seed=1, counter=True)
+        d.reseed(2)
+        assert np.array_equal(d.get_batch(100), Normal(seed=2, counter=True).get_batch(100))
+        choice = Choice(probabilities=[.2, .8], categories=['a', 'b'], seed=0, counter=True)
+        assert np.array_equal(choice.get_range(5, 10), choice.get_batch(10)[5:])
+        values = ValueChoice(['x', 'y', 'z'], seed=0, counter=True)
+        assert np.array_equal(values.get_range(3, 8), values.get_batch(8)[3:])
+        assert not RandomDatetime(Uniform(0, 1, counter=True), start=np.datetime64('2000-01-01'),
+                                  end=np.datetime64('2000-01-03'), unit='D').direct
+
+    def test_counter_raise(self):
+        with pytest.raises(ValueError):
+            Normal(legacy=True, counter=True)
+        with pytest.raises(ValueError):
+            Normal(threads=2, counter=True)
+        with pytest.raises(NotImplementedError):
+            Normal().get_range(0, 10)
+
+
 class TestTrigo:
     def _get_all(self):
         functions = [
@@ -577,6 +1431,13 @@ class TestCastGenerator:
 
 
 class TestTimeDelayedGenerator:
+    def test_no_delay(self):
+        tdg = TimeDelayedGenerator(generator=ConstantValueGenerator(21, dtype=np.uint16), time_delay_sec=0)
+        start = time.perf_counter()
+        assert tdg.get_single() == 21
+        assert len(tdg.get_batch(1000)) == 1000
+        assert time.perf_counter() - start < 0.1
+
     def test_values_single(self):
         time_delay_sec = 0.005
         tdg = TimeDelayedGenerator(generator=ConstantValueGenerator(21, dtype=np.uint16), time_delay_sec=time_delay_sec)
@@ -619,6 +1480,76 @@ class TestTimeDelayedGenerator:
         elapsed_timedelta = (end_time - start_time)
         assert datetime.timedelta(seconds=.47) <= elapsed_timedelta <= datetime.timedelta(seconds=.53)
 
+    def test_async(self):
+        async def take(stream, nb):
+            return [await stream.__anext__() for _ in range(nb)]
+
+        async def run():
+            streams = [TimeDelayedGenerator(generator=Autoincrement(), time_delay_sec=0.05).astream_single()
+                       for _ in range(1000)]
+            streams += [TimeDelayedGenerator(generator=Autoincrement(), time_delay_sec=0.0005).astream_batch(100)
+                        for _ in range(1000)]
+            return await asyncio.gather(*(take(stream, 10) for stream in streams))
+
+        start_time = datetime.datetime.now()
+        res = asyncio.run(run())
+        elapsed_timedelta = datetime.datetime.now() - start_time
+        # The 2000 streams wait concurrently
+        assert datetime.timedelta(seconds=.45) <= elapsed_timedelta <= datetime.timedelta(seconds=1.5)
+        assert res[0] == list(range(10))
+        assert np.array_equal(np.concatenate(res[-1]), np.arange(1000))
+
+    def test_async_default(self):
+        async def run():
+            stream = Autoincrement().astream_batch(10)
+            return [await Autoincrement().aget_single(), await stream.__anext__(), await stream.__anext__()]
+
+        res = asyncio.run(run())
+        assert res[0] == 0
+        assert np.array_equal(res[2], np.arange(10, 20))
+
+
+class TestRateScheduler:
+    def test_rate(self):
+        scheduler = RateScheduler(rate=100000)
+        start = time.monotonic()
+        for _ in range(200):
+            scheduler.wait(100)
+        elapsed = time.monotonic() - start
+        # The first wait is counted from the start of the schedule
+        assert .19 <= elapsed <= .25
+        stats = scheduler.stats()
+        assert stats['events'] == 20000
+        assert stats['target_rate'] == 100000
+        assert 80000 <= stats['achieved_rate'] <= 105000
+
+    def test_coalescing(self):
+        scheduler = RateScheduler(rate=1000000, min_sleep_sec=0.001)
+        waits = [scheduler.advance() for _ in range(100)]
+        # 100 events at 1M/s add up to less than the minimum sleep
+        assert waits == [0.0] * 100
+
+    def test_burst(self):
+        scheduler = RateScheduler(rate=1000, burst_sec=0.01)
+        scheduler.advance()
+        time.sleep(0.1)
+        assert .08 <= scheduler.advance(100) <= .1
+
+        scheduler = RateScheduler(rate=1000)
+        scheduler.advance()
+        time.sleep(0.1)
+        assert scheduler.advance(100) <= .01
+
+    def test_ticks(self):
+        scheduler = RateScheduler(rate=10000)
+        ticks = scheduler.ticks(0.02)
+        counts = []
+        for _ in range(5):
+            counts.append(next(ticks))
+            assert time.time() % 0.02 < 0.01
+        assert counts == [200] * 5
+        assert TimeDelayedGenerator(generator=Autoincrement(), rate=500).stream_ticks(0.01).__next__().shape == (5,)
+
 
 class TestHistory:
     def test_values_single(self):
@@ -640,6 +1571,26 @@ class TestHistory:
         for i in range(10):
             assert gen.get_prev(-10+i) == i
 
+    def test_stats(self):
+        size = 50
+        gen = History(Normal(seed=0), size)
+        values = list(np.zeros(size))
+        rs = np.random.RandomState(0)
+        for _ in range(200):
+            n = rs.choice([0, 1, 7, 49, 50, 51, 130])
+            if n == 1:
+                values.append(gen.get_single())
+            else:
+                values.extend(gen.get_batch(n))
+            window = np.array(values[-size:])
+            assert np.isclose(gen.get_sum(), window.sum())
+            assert np.isclose(gen.get_mean(), window.mean())
+            assert np.isclose(gen.get_var(), window.var())
+            assert gen.get_min() == window.min()
+            assert gen.get_max() == window.max()
+            for i in range(1, size + 1):
+                assert gen.get_prev(-i) == values[-i]
+
 
 class TestMeanHistory:
     def test_values_single(self):
@@ -655,6 +1606,78 @@ class TestMeanHistory:
             for j, v in enumerate(gen.get_batch(10)):
                 assert v == ((i * 10 + j) * 4.0 + 6.0) / 4.0
 
+    def test_batch_single(self):
+        g1 = MeanHistory(Normal(seed=0), 20)
+        g2 = MeanHistory(Normal(seed=0), 20)
+        for n in [0, 1, 5, 19, 20, 21, 47, 3]:
+            assert np.allclose(g1.get_batch(n), [g2.get_single() for _ in range(n)])
+        out = np.empty(30, dtype=np.float32)
+        assert g1.get_batch(30, out=out) is out
+        assert np.allclose(out, [g2.get_single() for _ in range(30)])
+
+
+class TestCategorical:
+    def test_value_choice(self):
+        values = ['FR', 'DE', 'IT', 'ES']
+        gen = ValueChoice(values, seed=0)
+        assert gen.get_single() in values
+        batch = gen.get_batch(1000)
+        assert batch.dtype == np.dtype('U2') and set(batch) == set(values)
+
+        gen = ValueChoice(values, probabilities=[0.7, 0.1, 0.1, 0.1], categorical=True, seed=0)
+        batch = gen.get_batch(1000)
+        assert isinstance(batch, CategoricalArray)
+        assert batch.codes.dtype == np.uint8
+        assert batch.categories is gen.values
+        assert np.array_equal(batch.decode(), np.asarray(values)[batch.codes])
+        assert np.array_equal(np.asarray(batch), batch.decode())
+        assert batch[3] == values[batch.codes[3]]
+        assert isinstance(batch[2:5], CategoricalArray) and len(batch[2:5]) == 3
+        assert 600 <= np.count_nonzero(batch.codes == 0) <= 800
+
+        out = np.empty(10, dtype=np.uint8)
+        assert gen.get_batch(10, out=out).codes is out
+
+    def test_choice(self):
+        p = [.05, .15, .05, .20, .25, .10, .20]
+        indexes = Choice(probabilities=p, seed=0).get_batch(1000)
+        names = list('abcdefg')
+        gen = Choice(probabilities=p, seed=0, categories=names)
+        assert np.array_equal(gen.get_batch(1000), np.asarray(names)[indexes])
+        assert gen.get_single() in names
+        batch = Choice(probabilities=p, seed=0, categories=names, categorical=True).get_batch(1000)
+        assert np.array_equal(batch.codes, indexes)
+        assert np.array_equal(batch.decode(), np.asarray(names)[indexes])
+        assert np.array_equal(Choice(probabilities=p, seed=0, categorical=True).get_batch(1000).decode(), indexes)
+
+    def test_regex(self):
+        gen = Regex(r'(OK|KO|ERR_[0-9])', seed=0, categorical=True)
+        assert len(gen.categories) == 12
+        assert np.isclose(gen.probabilities[list(gen.categories).index('OK')], 1 / 3)
+        batch = gen.get_batch(10000)
+        assert batch.codes.dtype == np.uint8
+        assert all(re.fullmatch(r'(OK|KO|ERR_[0-9])', e) for e in batch.decode())
+        assert np.array_equal(Regex(r'(OK|KO|ERR_[0-9])', seed=0, categorical=True).get_batch(10000).codes,
+                              batch.codes)
+        with pytest.raises(ValueError):
+            Regex(r'[0-9]{8}', categorical=True)
+        with pytest.raises(ValueError):
+            Regex(r'(a)\1', categorical=True)
+
+    def test_out(self, tmp_path):
+        for make in (lambda: ValueChoice(['a', 'bb'], seed=0, categorical=True),
+                     lambda: Choice([.5, .5], categories=['a', 'bb'], seed=0, categorical=True),
+                     lambda: Regex('(a|bb)', seed=0, categorical=True)):
+            expected = make().get_batch(12).decode()
+            gen = make()
+            # A batch returned before is reused
+            batches = [b.decode() for _, b in zip(range(3), gen.stream_batch(4, buffers=1))]
+            assert np.array_equal(np.concatenate(batches), expected)
+
+        write(ValueChoice(['a', 'bb'], seed=0, categorical=True), str(tmp_path / 'values.csv'), 10, batch_size=3)
+        with open(str(tmp_path / 'values.csv')) as f:
+            assert f.read().split()[1:] == list(ValueChoice(['a', 'bb'], seed=0).get_batch(10))
+
 
 class TestRegex:
     def test_values_single(self):
@@ -675,3 +1698,29 @@ class TestRegex:
             for i in range(42):
                 for e in gen.get_batch(10):
                     assert re.fullmatch(pattern, gen.get_single()) is not None
+
+    def test_values_batch_plan(self):
+        patterns = [r'(0|\+33|0033)[1-9][0-9]{8}', r'^[A-Z]{2,5}-\d+$', r'(ab|c(d|e{0,3})f)*x?', r'[^a-z]\w\s.',
+                    r'(?:é|ü)+', r'(a)\1']
+
+        for pattern in patterns:
+            gen = Regex(pattern, seed=0)
+            batch = gen.get_batch(500)
+            assert batch.dtype.kind == 'U'
+            assert len(batch) == 500
+            for e in batch:
+                assert re.fullmatch(pattern, e) is not None
+            assert np.array_equal(Regex(pattern, seed=0).get_batch(500), batch)
+            assert len(gen.get_batch(0)) == 0
+
+        assert Regex(r'(a)\1').plan is None
+        assert Regex(r'[0-9]{4}').get_batch(100).dtype == np.dtype('U4')
+        assert len(set(Regex(r'[0-9]{3}', seed=1).get_batch(100000))) == 1000
+
+    def test_pickle(self):
+        gen = Regex(r'[a-z]{3}\d', seed=0)
+        gen.get_single()
+        gen.get_batch(10)
+        copy = pickle.loads(pickle.dumps(gen))
+        assert copy.get_single() == gen.get_single()
+        assert np.array_equal(copy.get_batch(10), gen.get_batch(10))